@@ -0,0 +1,294 @@
+"""
+Benchmark suite for the chess bot
+Usage:
+    python Chess_Benchmark.py latency [--levels easy medium hard] [--plies 6]
+    python Chess_Benchmark.py multipv [--depth 3] [--lines 1 3 5]
+    python Chess_Benchmark.py mate
+    python Chess_Benchmark.py nps [--depth 3] [--weights nnue.npz]
+    python Chess_Benchmark.py suite wac.epd [--nodes 1000 5000 20000 | --times 0.5 1 2] [--workers 4]
+    python Chess_Benchmark.py clock [--control 1+0] [--level hard] [--moves 60]
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from Chess_Bot import ChessBot, DIFFICULTY_LEVELS, mate_in
+from Chess_Clock import GameClock, format_clock, parse_time_control
+from Chess_MateSolver import MateSolver
+
+# Opening, middlegame and endgame positions the benchmarks start from
+BENCHMARK_POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "2r3k1/pp3ppp/4p3/3pP3/3P4/P4N2/1P3PPP/2R3K1 w - - 0 25",
+    "8/5pk1/6p1/3R4/7P/6P1/r4PK1/8 b - - 0 40",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+# Puzzle positions with a forced mate, as (FEN, mate in N moves)
+MATE_POSITIONS = [
+    ("kbK5/pp6/1P6/8/8/8/8/R7 w - - 0 1", 2),
+    ("r2qkb1r/pp2nppp/3p4/2pNN1B1/2BnP3/3P4/PPP2PPP/R2bK2R w KQkq - 1 1", 2),
+    ("r5rk/5p1p/5R2/4B3/8/8/7P/7K w - - 0 1", 3),
+    ("1k5r/pP3ppp/3p2b1/1BN1n3/1Q2P3/P1B5/KP3P1P/7q w - - 1 0", 3),
+]
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def timed_move(bot, board):
+    """Ask the bot for a move, silencing its statistics, and return (move, seconds)"""
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        move = bot.get_best_move(board)
+    return move, time.perf_counter() - start_time
+
+def run_latency(args):
+    """Self-play from every benchmark position and check each level's p99 move latency"""
+    print(f"{'level':<8}{'moves':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'budget':>9}  result")
+    all_passed = True
+    for level in args.levels:
+        latencies = []
+        for fen in BENCHMARK_POSITIONS:
+            bot = ChessBot(difficulty=level, backend=args.backend)
+            board = chess.Board(fen)
+            for _ in range(args.plies):
+                if board.is_game_over():
+                    break
+                move, elapsed = timed_move(bot, board)
+                latencies.append(elapsed)
+                board.push(move)
+        budget = bot.time_budget
+        p99 = percentile(latencies, 0.99)
+        passed = p99 <= budget
+        all_passed = all_passed and passed
+        print(f"{level:<8}{len(latencies):>7}{percentile(latencies, 0.5):>9.3f}{percentile(latencies, 0.9):>9.3f}"
+              f"{p99:>9.3f}{max(latencies):>9.3f}{budget:>9.3f}  {'ok' if passed else 'OVER BUDGET'}")
+    return 0 if all_passed else 1
+
+def run_multipv(args):
+    """Compare the nodes and time of multi-PV analysis against a single-PV search at a fixed depth"""
+    print(f"{'lines':<7}{'nodes':>10}{'seconds':>10}{'node ratio':>12}{'time ratio':>12}")
+    baseline = None
+    for num_lines in args.lines:
+        nodes = 0
+        seconds = 0.0
+        for fen in BENCHMARK_POSITIONS:
+            # Fresh bot per run so no line starts from a warm transposition table
+            bot = ChessBot(difficulty='hard', backend=args.backend, max_depth=args.depth,
+                           node_budget=10 ** 9, time_budget=3600)
+            board = chess.Board(fen)
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if num_lines == 1:
+                    bot.get_best_move(board)
+                else:
+                    bot.analyze(board, num_lines)
+            seconds += time.perf_counter() - start_time
+            nodes += bot.nodes_evaluated
+        if baseline is None:
+            baseline = (nodes, seconds)
+        print(f"{num_lines:<7}{nodes:>10}{seconds:>10.2f}{nodes / baseline[0]:>12.2f}{seconds / baseline[1]:>12.2f}")
+    return 0
+
+def run_mate(args):
+    """Time the mate solver against a full search to the same depth on mate puzzles"""
+    print(f"{'mate in':<9}{'solver nodes':>14}{'solver s':>10}{'search nodes':>14}{'search s':>10}  found")
+    for fen, moves in MATE_POSITIONS:
+        board = chess.Board(fen)
+        solver = MateSolver(args.backend)
+        start_time = time.perf_counter()
+        line = solver.solve(board, moves)
+        solver_time = time.perf_counter() - start_time
+
+        bot = ChessBot(difficulty='hard', backend=args.backend, max_depth=2 * moves - 1,
+                       node_budget=10 ** 9, time_budget=3600)
+        _, search_time = timed_move(bot, board)
+        found = line is not None and mate_in(bot.last_score) == moves
+        print(f"{moves:<9}{solver.nodes:>14}{solver_time:>10.3f}{bot.nodes_evaluated:>14}{search_time:>10.3f}"
+              f"  {'ok' if found else 'MISSED'}")
+    return 0
+
+def run_nps(args):
+    """Search nodes per second with the classical evaluation and the NNUE-style network"""
+    from Chess_NNUE import NNUEEvaluator
+
+    evaluators = {
+        'classical': None,
+        'nnue': NNUEEvaluator(args.weights) if args.weights else NNUEEvaluator.from_classical(),
+    }
+    print(f"{'evaluator':<11}{'nodes':>10}{'seconds':>10}{'nps':>10}")
+    for name, evaluator in evaluators.items():
+        nodes = 0
+        seconds = 0.0
+        for fen in BENCHMARK_POSITIONS:
+            bot = ChessBot(difficulty='hard', backend=args.backend, max_depth=args.depth,
+                           node_budget=10 ** 9, time_budget=3600, evaluator=evaluator)
+            _, elapsed = timed_move(bot, chess.Board(fen))
+            nodes += bot.nodes_evaluated
+            seconds += elapsed
+        print(f"{name:<11}{nodes:>10}{seconds:>10.2f}{nodes / seconds:>10.0f}")
+    return 0
+
+def load_epd_suite(path):
+    """Positions of an EPD suite as (id, fen, best moves, avoid moves) with moves in UCI"""
+    positions = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            board, operations = chess.Board.from_epd(line)
+            best_moves = [move.uci() for move in operations.get('bm', [])]
+            avoid_moves = [move.uci() for move in operations.get('am', [])]
+            if best_moves or avoid_moves:
+                positions.append((operations.get('id', f"{path}:{line_number}"), board.fen(), best_moves, avoid_moves))
+    return positions
+
+def is_solution(move, best_moves, avoid_moves):
+    move = move.uci()
+    return (not best_moves or move in best_moves) and move not in avoid_moves
+
+def solve_position(fen, best_moves, avoid_moves, budget_kind, budget, backend):
+    """
+    Worker process: search one suite position under a node or time budget
+    Returns (solved, seconds to solution, nodes, depth). The solution time is
+    when the search settled on a solving move it kept to the end.
+    """
+    limits = {'node_budget': int(budget), 'time_budget': 3600} if budget_kind == 'nodes' else \
+             {'node_budget': 10 ** 9, 'time_budget': budget}
+    bot = ChessBot(difficulty='hard', backend=backend, max_depth=32, **limits)
+    move, elapsed = timed_move(bot, chess.Board(fen))
+    if not is_solution(move, best_moves, avoid_moves):
+        return False, None, bot.nodes_evaluated, bot.search_depth
+    solution_time = elapsed
+    for _, iteration_move, _, seconds, _ in reversed(bot.iterations):
+        if not is_solution(iteration_move, best_moves, avoid_moves):
+            break
+        solution_time = seconds
+    return True, solution_time, bot.nodes_evaluated, bot.search_depth
+
+def run_suite(args):
+    """Solve rate and time-to-solution of EPD suites across a range of budgets"""
+    positions = [position for path in args.suites for position in load_epd_suite(path)]
+    budget_kind, budgets = ('time', args.times) if args.times else ('nodes', args.nodes)
+    print(f"{len(positions)} positions, {args.workers} workers, backend {args.backend}")
+    print(f"{'seconds' if budget_kind == 'time' else 'nodes':>9}{'solved':>9}{'rate':>8}{'avg tts':>10}"
+          f"{'worker s':>10}{'solved/s':>10}  curve")
+    failures = {}
+    with ProcessPoolExecutor(args.workers) as pool:
+        for budget in budgets:
+            start_time = time.perf_counter()
+            futures = [pool.submit(solve_position, fen, best_moves, avoid_moves, budget_kind, budget, args.backend)
+                       for _, fen, best_moves, avoid_moves in positions]
+            results = [future.result() for future in futures]
+            wall_time = time.perf_counter() - start_time
+            solved = [result for result in results if result[0]]
+            for (position_id, _, _, _), result in zip(positions, results):
+                if not result[0]:
+                    failures.setdefault(position_id, []).append(budget)
+            rate = len(solved) / len(positions)
+            average = sum(result[1] for result in solved) / len(solved) if solved else 0.0
+            # Solved positions per second of worker time: tactics per second at this budget
+            print(f"{budget:>9g}{len(solved):>9}{rate:>8.1%}{average:>10.3f}{wall_time * args.workers:>10.1f}"
+                  f"{len(solved) / (wall_time * args.workers):>10.2f}  {'#' * round(rate * 40)}")
+    if args.verbose:
+        for position_id, missed_budgets in failures.items():
+            print(f"unsolved {position_id} at {', '.join(f'{budget:g}' for budget in missed_budgets)}")
+    return 0
+
+def run_clock(args):
+    """Self-play games under a time control and report how the clock was spent"""
+    initial, increment = parse_time_control(args.control)
+    print(f"{'game':<6}{'moves':>7}{'forced':>8}{'forced s':>10}{'avg s':>8}{'max s':>8}{'white left':>12}"
+          f"{'black left':>12}  result")
+    flags = 0
+    for game, fen in enumerate(BENCHMARK_POSITIONS[:args.games], 1):
+        # No node cap, so only the clock limits the search
+        bots = {color: ChessBot(difficulty=args.level, backend=args.backend, node_budget=10 ** 9, max_depth=32)
+                for color in chess.COLORS}
+        board = chess.Board(fen)
+        clock = GameClock(initial, increment)
+        clock.start(board.turn)
+        times = []
+        forced_times = []
+        result = 'unfinished'
+        while len(times) + len(forced_times) < args.moves and not board.is_game_over():
+            forced = board.legal_moves.count() == 1
+            color = board.turn
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                move = bots[color].get_best_move(board, clock.remaining(color), increment)
+            elapsed = time.perf_counter() - start_time
+            (forced_times if forced else times).append(elapsed)
+            if clock.flagged(color):
+                result = f"{'white' if color == chess.WHITE else 'black'} flagged"
+                flags += 1
+                break
+            board.push(move)
+            clock.press()
+        clock.stop()
+        if board.is_game_over():
+            result = board.result()
+        forced_average = sum(forced_times) / len(forced_times) if forced_times else 0.0
+        print(f"{game:<6}{len(times) + len(forced_times):>7}{len(forced_times):>8}{forced_average:>10.4f}"
+              f"{sum(times) / max(1, len(times)):>8.2f}{max(times, default=0.0):>8.2f}"
+              f"{format_clock(clock.remaining(chess.WHITE)):>12}{format_clock(clock.remaining(chess.BLACK)):>12}  {result}")
+    return 1 if flags else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Chess bot benchmarks")
+    parser.add_argument('--backend', default='python-chess', help="search backend ('python-chess' or 'bitboard')")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    latency = commands.add_parser('latency', help="p99 move latency per difficulty level")
+    latency.add_argument('--levels', nargs='+', default=list(DIFFICULTY_LEVELS), choices=list(DIFFICULTY_LEVELS))
+    latency.add_argument('--plies', type=int, default=6, help="self-play moves from each position")
+    latency.set_defaults(run=run_latency)
+
+    multipv = commands.add_parser('multipv', help="cost of multi-PV analysis relative to a single-PV search")
+    multipv.add_argument('--depth', type=int, default=3)
+    multipv.add_argument('--lines', nargs='+', type=int, default=[1, 3, 5],
+                         help="line counts to compare; 1 is the single-PV get_best_move baseline")
+    multipv.set_defaults(run=run_multipv)
+
+    mate = commands.add_parser('mate', help="mate-in-N solver against a full search at equal depth")
+    mate.set_defaults(run=run_mate)
+
+    nps = commands.add_parser('nps', help="search speed of the classical and network evaluators")
+    nps.add_argument('--depth', type=int, default=3)
+    nps.add_argument('--weights', help="network weight file (default: weights built from the classical tables)")
+    nps.set_defaults(run=run_nps)
+
+    suite = commands.add_parser('suite', help="solve rate and time-to-solution on EPD suites (bm/am)")
+    suite.add_argument('suites', nargs='+', help="EPD files with bm and/or am operations")
+    budget = suite.add_mutually_exclusive_group()
+    budget.add_argument('--nodes', nargs='+', type=int, default=[1000, 5000, 20000], help="node budgets")
+    budget.add_argument('--times', nargs='+', type=float, help="time budgets in seconds (instead of nodes)")
+    suite.add_argument('--workers', type=int, default=os.cpu_count(), help="positions searched in parallel")
+    suite.add_argument('--verbose', action='store_true', help="list the unsolved positions")
+    suite.set_defaults(run=run_suite)
+
+    clock = commands.add_parser('clock', help="self-play under a game clock: time per move, forced moves, flags")
+    clock.add_argument('--control', default='1+0', help="minutes + increment seconds, e.g. 3+2")
+    clock.add_argument('--level', default='hard', choices=list(DIFFICULTY_LEVELS))
+    clock.add_argument('--moves', type=int, default=60, help="plies played per game at most")
+    clock.add_argument('--games', type=int, default=2, help="games, from the first benchmark positions")
+    clock.set_defaults(run=run_clock)
+
+    args = parser.parse_args()
+    sys.exit(args.run(args))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
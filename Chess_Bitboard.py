@@ -0,0 +1,678 @@
+"""
+Lean bitboard board for the chess bot's search
+Integer bitboards, precomputed attack tables and make/unmake without any
+python-chess history objects. Moves are the packed 16-bit integers used by
+Chess_Bot: from-square | to-square << 6 | promotion piece type << 12.
+"""
+import chess
+import chess.polyglot
+
+BB_ALL = 0xFFFF_FFFF_FFFF_FFFF
+BB_SQUARES = [1 << square for square in range(64)]
+BB_RANK_1 = 0xFF
+BB_RANK_8 = 0xFF << 56
+BB_RANKS = [0xFF << (8 * rank) for rank in range(8)]
+
+E1, G1, C1, E8, G8, C8 = chess.E1, chess.G1, chess.C1, chess.E8, chess.G8, chess.C8
+H1, A1, H8, A8 = chess.H1, chess.A1, chess.H8, chess.A8
+
+def _step_attacks(deltas):
+    """Attack table for a leaper given (file, rank) offsets"""
+    table = []
+    for square in range(64):
+        file, rank = square & 7, square >> 3
+        mask = 0
+        for df, dr in deltas:
+            if 0 <= file + df <= 7 and 0 <= rank + dr <= 7:
+                mask |= BB_SQUARES[(rank + dr) * 8 + file + df]
+        table.append(mask)
+    return table
+
+KNIGHT_ATTACKS = _step_attacks([(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)])
+KING_ATTACKS = _step_attacks([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+# Indexed by colour like python-chess: PAWN_ATTACKS[chess.WHITE][square]
+PAWN_ATTACKS = [_step_attacks([(-1, -1), (1, -1)]), _step_attacks([(-1, 1), (1, 1)])]
+
+def _ray(square, df, dr):
+    """Squares from square (exclusive) to the board edge in one direction"""
+    squares = []
+    file, rank = (square & 7) + df, (square >> 3) + dr
+    while 0 <= file <= 7 and 0 <= rank <= 7:
+        squares.append(rank * 8 + file)
+        file, rank = file + df, rank + dr
+    return squares
+
+def _line_tables(directions):
+    """
+    Kindergarten-style sliding attacks along one line through every square
+    Only the inner squares of the line can block, so each table is indexed by
+    the occupancy masked to those squares and holds the resulting attacks.
+    """
+    masks = []
+    tables = []
+    for square in range(64):
+        rays = [_ray(square, df, dr) for df, dr in directions]
+        relevant = 0
+        for ray in rays:
+            for target in ray[:-1]:
+                relevant |= BB_SQUARES[target]
+        table = {}
+        # Enumerate every subset of the relevant squares (Carry-Rippler)
+        subset = 0
+        while True:
+            attacks = 0
+            for ray in rays:
+                for target in ray:
+                    attacks |= BB_SQUARES[target]
+                    if subset & BB_SQUARES[target]:
+                        break
+            table[subset] = attacks
+            subset = (subset - relevant) & relevant
+            if not subset:
+                break
+        masks.append(relevant)
+        tables.append(table)
+    return masks, tables
+
+RANK_MASKS, RANK_ATTACKS = _line_tables([(1, 0), (-1, 0)])
+FILE_MASKS, FILE_ATTACKS = _line_tables([(0, 1), (0, -1)])
+DIAG_MASKS, DIAG_ATTACKS = _line_tables([(1, 1), (-1, -1)])
+ANTI_MASKS, ANTI_ATTACKS = _line_tables([(1, -1), (-1, 1)])
+
+def _between_and_lines():
+    """BETWEEN[a * 64 + b] holds the squares strictly between a and b, LINES[a * 64 + b] the full line through both"""
+    between = [0] * 4096
+    lines = [0] * 4096
+    for square in range(64):
+        for df, dr in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+            forward = _ray(square, df, dr)
+            backward = _ray(square, -df, -dr)
+            line = BB_SQUARES[square]
+            for target in forward + backward:
+                line |= BB_SQUARES[target]
+            for ray in (forward, backward):
+                gap = 0
+                for target in ray:
+                    between[square * 64 + target] = gap
+                    lines[square * 64 + target] = line
+                    gap |= BB_SQUARES[target]
+    return between, lines
+
+BETWEEN, LINES = _between_and_lines()
+
+def rook_attacks(square, occupied):
+    """Rook attacks from square given the occupancy"""
+    return (RANK_ATTACKS[square][occupied & RANK_MASKS[square]] |
+            FILE_ATTACKS[square][occupied & FILE_MASKS[square]])
+
+def bishop_attacks(square, occupied):
+    """Bishop attacks from square given the occupancy"""
+    return (DIAG_ATTACKS[square][occupied & DIAG_MASKS[square]] |
+            ANTI_ATTACKS[square][occupied & ANTI_MASKS[square]])
+
+def scan_reversed(bb):
+    """Yield the squares of a bitboard from the highest to the lowest"""
+    while bb:
+        square = bb.bit_length() - 1
+        yield square
+        bb ^= BB_SQUARES[square]
+
+# Polyglot Zobrist keys, so keys agree with chess.polyglot.zobrist_hash
+_POLYGLOT = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+ZOBRIST_PIECES = [[[0] * 64] + [[_POLYGLOT[64 * ((piece_type - 1) * 2 + color) + square] for square in range(64)]
+                                for piece_type in chess.PIECE_TYPES]
+                  for color in (chess.BLACK, chess.WHITE)]
+ZOBRIST_TURN = _POLYGLOT[780]
+ZOBRIST_EP = [_POLYGLOT[772 + (square & 7)] for square in range(64)]
+
+def _castling_keys():
+    """Zobrist key for every combination of castling rook squares"""
+    keys = {}
+    corners = [(BB_SQUARES[H1], 768), (BB_SQUARES[A1], 769), (BB_SQUARES[H8], 770), (BB_SQUARES[A8], 771)]
+    for combination in range(16):
+        rights = 0
+        key = 0
+        for bit, (corner, index) in enumerate(corners):
+            if combination & (1 << bit):
+                rights |= corner
+                key ^= _POLYGLOT[index]
+        keys[rights] = key
+    return keys
+
+ZOBRIST_CASTLING = _castling_keys()
+CASTLING_CORNERS = BB_SQUARES[H1] | BB_SQUARES[A1] | BB_SQUARES[H8] | BB_SQUARES[A8]
+
+def ep_key(board):
+    """Polyglot en passant key of any board: only hashed when a pawn could capture"""
+    ep_square = board.ep_square
+    if ep_square is not None and (PAWN_ATTACKS[not board.turn][ep_square] &
+                                  board.pawns & board.occupied_co[board.turn]):
+        return ZOBRIST_EP[ep_square]
+    return 0
+
+def move_key_delta(board, code):
+    """Zobrist change of the pieces a packed move displaces, taken before the move is made"""
+    from_square = code & 63
+    to_square = (code >> 6) & 63
+    us = board.turn
+    them = not us
+    piece_type = board.piece_type_at(from_square)
+    captured = board.piece_type_at(to_square)
+    delta = ZOBRIST_PIECES[us][piece_type][from_square] ^ ZOBRIST_PIECES[us][(code >> 12) or piece_type][to_square]
+    if captured:
+        delta ^= ZOBRIST_PIECES[them][captured][to_square]
+    elif piece_type == chess.PAWN and to_square == board.ep_square:
+        delta ^= ZOBRIST_PIECES[them][chess.PAWN][to_square - 8 if us else to_square + 8]
+    elif piece_type == chess.KING and to_square - from_square in (2, -2):
+        rook_from, rook_to = (to_square + 1, to_square - 1) if to_square > from_square else (to_square - 2, to_square + 1)
+        delta ^= ZOBRIST_PIECES[us][chess.ROOK][rook_from] ^ ZOBRIST_PIECES[us][chess.ROOK][rook_to]
+    return delta
+
+def history_keys(board):
+    """Zobrist keys of a chess.Board's earlier positions, back to the last irreversible move"""
+    keys = []
+    previous = board.copy()
+    for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+        previous.pop()
+        keys.append(chess.polyglot.zobrist_hash(previous))
+    keys.reverse()
+    return keys
+
+def static_exchange(board, code, values):
+    """
+    Static exchange evaluation of a capture: the material the side to move
+    gains if both sides keep recapturing on the target square with their least
+    valuable attacker, each stopping when recapturing would lose material.
+    Works on chess.Board and SearchBoard alike; pins are ignored.
+    :param values: piece values indexed by piece type
+    """
+    from_square = code & 63
+    to_square = (code >> 6) & 63
+    promotion = code >> 12
+    piece_bitboards = (0, board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    diagonal = board.bishops | board.queens
+    straight = board.rooks | board.queens
+    occupied = board.occupied ^ BB_SQUARES[from_square]
+
+    victim = board.piece_type_at(to_square)
+    if victim is None:
+        # En passant: the captured pawn is behind the target square
+        victim = chess.PAWN
+        occupied ^= BB_SQUARES[to_square ^ 8]
+    gain = [values[victim] + (values[promotion] - values[chess.PAWN] if promotion else 0)]
+    on_square = values[promotion or board.piece_type_at(from_square)]
+
+    attackers = (
+        (KNIGHT_ATTACKS[to_square] & board.knights) |
+        (KING_ATTACKS[to_square] & board.kings) |
+        (PAWN_ATTACKS[chess.WHITE][to_square] & board.pawns & board.occupied_co[chess.BLACK]) |
+        (PAWN_ATTACKS[chess.BLACK][to_square] & board.pawns & board.occupied_co[chess.WHITE]) |
+        (rook_attacks(to_square, occupied) & straight) |
+        (bishop_attacks(to_square, occupied) & diagonal)
+    ) & occupied
+    color = not board.turn
+    while True:
+        own = attackers & board.occupied_co[color]
+        if not own:
+            break
+        for piece_type in chess.PIECE_TYPES:
+            candidates = own & piece_bitboards[piece_type]
+            if candidates:
+                break
+        # The king may only take last
+        if piece_type == chess.KING and attackers & board.occupied_co[not color]:
+            break
+        gain.append(on_square - gain[-1])
+        on_square = values[piece_type]
+        occupied ^= candidates & -candidates
+        # Removing the capturer can uncover a slider behind it
+        attackers = (attackers | (rook_attacks(to_square, occupied) & straight) |
+                     (bishop_attacks(to_square, occupied) & diagonal)) & occupied
+        color = not color
+
+    # Each side chooses between standing pat and continuing the exchange
+    for depth in range(len(gain) - 1, 0, -1):
+        gain[depth - 1] = -max(-gain[depth - 1], gain[depth])
+    return gain[0]
+
+PIECES = [[None] + [chess.Piece(piece_type, color) for piece_type in chess.PIECE_TYPES]
+          for color in (chess.BLACK, chess.WHITE)]
+
+class SearchBoard:
+    """
+    Bitboard position with make/unmake for the search
+    Exposes the same bitboard attributes as chess.Board (pawns, ..., occupied_co,
+    occupied, turn, ep_square) so evaluation code works on either board.
+    """
+    def __init__(self):
+        self.bitboards = [0] * 7  # indexed by piece type
+        self.occupied_co = [0, 0]
+        self.occupied = 0
+        self.piece_types = [0] * 64
+        self.turn = chess.WHITE
+        self.castling_rights = 0
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.key = 0
+        self.key_history = []  # keys of earlier positions, oldest first
+        self._stack = []
+
+    @classmethod
+    def from_board(cls, board):
+        """Build a search board from a chess.Board position"""
+        search_board = cls()
+        for square, piece in board.piece_map().items():
+            search_board._toggle(square, piece.piece_type, piece.color)
+            search_board.piece_types[square] = piece.piece_type
+        search_board.turn = board.turn
+        search_board.castling_rights = board.clean_castling_rights() & CASTLING_CORNERS
+        search_board.ep_square = board.ep_square
+        search_board.halfmove_clock = board.halfmove_clock
+        search_board.fullmove_number = board.fullmove_number
+        search_board.key = chess.polyglot.zobrist_hash(board)
+        search_board.key_history = history_keys(board)
+        return search_board
+
+    # Bitboard views matching chess.Board
+    pawns = property(lambda self: self.bitboards[chess.PAWN])
+    knights = property(lambda self: self.bitboards[chess.KNIGHT])
+    bishops = property(lambda self: self.bitboards[chess.BISHOP])
+    rooks = property(lambda self: self.bitboards[chess.ROOK])
+    queens = property(lambda self: self.bitboards[chess.QUEEN])
+    kings = property(lambda self: self.bitboards[chess.KING])
+
+    def _toggle(self, square, piece_type, color):
+        """Flip a piece on or off in the bitboards"""
+        bb = BB_SQUARES[square]
+        self.bitboards[piece_type] ^= bb
+        self.occupied_co[color] ^= bb
+        self.occupied ^= bb
+
+    def piece_type_at(self, square):
+        """Piece type on a square, or None"""
+        return self.piece_types[square] or None
+
+    def piece_at(self, square):
+        """chess.Piece on a square, or None"""
+        piece_type = self.piece_types[square]
+        if not piece_type:
+            return None
+        return PIECES[bool(self.occupied_co[chess.WHITE] & BB_SQUARES[square])][piece_type]
+
+    def pieces_mask(self, piece_type, color):
+        """Bitboard of the pieces of one type and colour"""
+        return self.bitboards[piece_type] & self.occupied_co[color]
+
+    def pieces(self, piece_type, color):
+        """SquareSet of the pieces of one type and colour"""
+        return chess.SquareSet(self.bitboards[piece_type] & self.occupied_co[color])
+
+    def king(self, color):
+        """Square of the king of the given colour, or None"""
+        king_mask = self.bitboards[chess.KING] & self.occupied_co[color]
+        return king_mask.bit_length() - 1 if king_mask else None
+
+    def transposition_key(self):
+        """Zobrist key of the position (polyglot compatible)"""
+        return self.key
+
+    def attacks_mask(self, square):
+        """Squares attacked by the piece on square"""
+        piece_type = self.piece_types[square]
+        if piece_type == chess.PAWN:
+            return PAWN_ATTACKS[bool(self.occupied_co[chess.WHITE] & BB_SQUARES[square])][square]
+        elif piece_type == chess.KNIGHT:
+            return KNIGHT_ATTACKS[square]
+        elif piece_type == chess.KING:
+            return KING_ATTACKS[square]
+        elif piece_type == chess.BISHOP:
+            return bishop_attacks(square, self.occupied)
+        elif piece_type == chess.ROOK:
+            return rook_attacks(square, self.occupied)
+        elif piece_type == chess.QUEEN:
+            return rook_attacks(square, self.occupied) | bishop_attacks(square, self.occupied)
+        return 0
+
+    def attackers_mask(self, color, square, occupied):
+        """Pieces of color attacking square given the occupancy"""
+        bitboards = self.bitboards
+        queens = bitboards[chess.QUEEN]
+        attackers = (
+            (KNIGHT_ATTACKS[square] & bitboards[chess.KNIGHT]) |
+            (KING_ATTACKS[square] & bitboards[chess.KING]) |
+            (PAWN_ATTACKS[not color][square] & bitboards[chess.PAWN]) |
+            (rook_attacks(square, occupied) & (bitboards[chess.ROOK] | queens)) |
+            (bishop_attacks(square, occupied) & (bitboards[chess.BISHOP] | queens))
+        )
+        return attackers & self.occupied_co[color] & occupied
+
+    def is_check(self):
+        """Is the side to move in check"""
+        king = self.king(self.turn)
+        return king is not None and bool(self.attackers_mask(not self.turn, king, self.occupied))
+
+    def push_code(self, code):
+        """Make a packed move"""
+        from_square = code & 63
+        to_square = (code >> 6) & 63
+        promotion = (code >> 12) & 7
+        us = self.turn
+        them = not us
+        piece_types = self.piece_types
+        piece_type = piece_types[from_square]
+        captured = piece_types[to_square]
+        ep_square = self.ep_square
+        self._stack.append((code, captured, self.castling_rights, ep_square, self.halfmove_clock))
+        self.key_history.append(self.key)
+
+        key = self.key ^ ep_key(self) ^ ZOBRIST_TURN ^ ZOBRIST_CASTLING[self.castling_rights]
+        self.halfmove_clock += 1
+        self.ep_square = None
+
+        if captured:
+            self._toggle(to_square, captured, them)
+            key ^= ZOBRIST_PIECES[them][captured][to_square]
+            self.halfmove_clock = 0
+
+        self._toggle(from_square, piece_type, us)
+        key ^= ZOBRIST_PIECES[us][piece_type][from_square]
+        piece_types[from_square] = 0
+        placed = piece_type
+
+        if piece_type == chess.PAWN:
+            self.halfmove_clock = 0
+            if to_square == ep_square and not captured:
+                # En passant: the captured pawn sits behind the target square
+                captured_square = to_square - 8 if us else to_square + 8
+                self._toggle(captured_square, chess.PAWN, them)
+                key ^= ZOBRIST_PIECES[them][chess.PAWN][captured_square]
+                piece_types[captured_square] = 0
+            elif to_square - from_square in (16, -16):
+                self.ep_square = (from_square + to_square) >> 1
+            if promotion:
+                placed = promotion
+        elif piece_type == chess.KING:
+            self.castling_rights &= ~(BB_RANK_1 if us else BB_RANK_8)
+            if to_square - from_square in (2, -2):
+                # Castling: move the rook across the king
+                rook_from, rook_to = (to_square + 1, to_square - 1) if to_square > from_square else (to_square - 2, to_square + 1)
+                self._toggle(rook_from, chess.ROOK, us)
+                self._toggle(rook_to, chess.ROOK, us)
+                key ^= ZOBRIST_PIECES[us][chess.ROOK][rook_from] ^ ZOBRIST_PIECES[us][chess.ROOK][rook_to]
+                piece_types[rook_from] = 0
+                piece_types[rook_to] = chess.ROOK
+
+        self._toggle(to_square, placed, us)
+        key ^= ZOBRIST_PIECES[us][placed][to_square]
+        piece_types[to_square] = placed
+
+        self.castling_rights &= ~(BB_SQUARES[from_square] | BB_SQUARES[to_square])
+        if not us:
+            self.fullmove_number += 1
+        self.turn = them
+        self.key = key ^ ZOBRIST_CASTLING[self.castling_rights] ^ ep_key(self)
+
+    def pop_code(self):
+        """Unmake the last packed move"""
+        code, captured, castling_rights, ep_square, halfmove_clock = self._stack.pop()
+        from_square = code & 63
+        to_square = (code >> 6) & 63
+        them = self.turn
+        us = not them
+        piece_types = self.piece_types
+        placed = piece_types[to_square]
+        piece_type = chess.PAWN if code >> 12 else placed
+
+        self._toggle(to_square, placed, us)
+        piece_types[to_square] = 0
+        self._toggle(from_square, piece_type, us)
+        piece_types[from_square] = piece_type
+
+        if captured:
+            self._toggle(to_square, captured, them)
+            piece_types[to_square] = captured
+        elif piece_type == chess.PAWN and to_square == ep_square:
+            captured_square = to_square - 8 if us else to_square + 8
+            self._toggle(captured_square, chess.PAWN, them)
+            piece_types[captured_square] = chess.PAWN
+        elif piece_type == chess.KING and to_square - from_square in (2, -2):
+            rook_from, rook_to = (to_square + 1, to_square - 1) if to_square > from_square else (to_square - 2, to_square + 1)
+            self._toggle(rook_to, chess.ROOK, us)
+            self._toggle(rook_from, chess.ROOK, us)
+            piece_types[rook_to] = 0
+            piece_types[rook_from] = chess.ROOK
+
+        if not us:
+            self.fullmove_number -= 1
+        self.turn = us
+        self.castling_rights = castling_rights
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.key = self.key_history.pop()
+
+    # Look-ahead inside move generation uses these, so hooks an evaluator
+    # installs on push_code/pop_code only see the search's own moves
+    _push_code = push_code
+    _pop_code = pop_code
+
+    def gives_check_code(self, code):
+        """Does the packed move give check"""
+        self._push_code(code)
+        check = self.is_check()
+        self._pop_code()
+        return check
+
+    def _generate_pseudo(self, moves, from_mask, to_mask):
+        """Append pseudo-legal moves in python-chess generation order"""
+        us = self.turn
+        our_pieces = self.occupied_co[us]
+        occupied = self.occupied
+        piece_types = self.piece_types
+
+        # Piece moves
+        for from_square in scan_reversed(our_pieces & ~self.bitboards[chess.PAWN] & from_mask):
+            piece_type = piece_types[from_square]
+            if piece_type == chess.KNIGHT:
+                targets = KNIGHT_ATTACKS[from_square]
+            elif piece_type == chess.BISHOP:
+                targets = bishop_attacks(from_square, occupied)
+            elif piece_type == chess.ROOK:
+                targets = rook_attacks(from_square, occupied)
+            elif piece_type == chess.QUEEN:
+                targets = rook_attacks(from_square, occupied) | bishop_attacks(from_square, occupied)
+            else:
+                targets = KING_ATTACKS[from_square]
+            for to_square in scan_reversed(targets & ~our_pieces & to_mask):
+                moves.append(from_square | (to_square << 6))
+
+        # Castling
+        if from_mask & self.bitboards[chess.KING]:
+            self._generate_castling(moves)
+
+        pawns = self.bitboards[chess.PAWN] & our_pieces & from_mask
+        if not pawns:
+            return
+
+        # Pawn captures
+        their_pieces = self.occupied_co[not us] & to_mask
+        for from_square in scan_reversed(pawns):
+            for to_square in scan_reversed(PAWN_ATTACKS[us][from_square] & their_pieces):
+                move = from_square | (to_square << 6)
+                if to_square >> 3 in (0, 7):
+                    moves.extend((move | chess.QUEEN << 12, move | chess.ROOK << 12,
+                                  move | chess.BISHOP << 12, move | chess.KNIGHT << 12))
+                else:
+                    moves.append(move)
+
+        # Pawn advances
+        if us:
+            single_moves = pawns << 8 & ~occupied
+            double_moves = single_moves << 8 & ~occupied & (BB_RANKS[2] | BB_RANKS[3])
+            step = -8
+        else:
+            single_moves = pawns >> 8 & ~occupied
+            double_moves = single_moves >> 8 & ~occupied & (BB_RANKS[5] | BB_RANKS[4])
+            step = 8
+        for to_square in scan_reversed(single_moves & to_mask):
+            move = (to_square + step) | (to_square << 6)
+            if to_square >> 3 in (0, 7):
+                moves.extend((move | chess.QUEEN << 12, move | chess.ROOK << 12,
+                              move | chess.BISHOP << 12, move | chess.KNIGHT << 12))
+            else:
+                moves.append(move)
+        for to_square in scan_reversed(double_moves & to_mask):
+            moves.append((to_square + 2 * step) | (to_square << 6))
+
+        # En passant
+        if self.ep_square is not None:
+            self._generate_ep(moves, from_mask, to_mask)
+
+    def _generate_ep(self, moves, from_mask, to_mask):
+        """Append pseudo-legal en passant captures"""
+        ep_square = self.ep_square
+        if not BB_SQUARES[ep_square] & to_mask or BB_SQUARES[ep_square] & self.occupied:
+            return
+        us = self.turn
+        capturers = (self.bitboards[chess.PAWN] & self.occupied_co[us] & from_mask &
+                     PAWN_ATTACKS[not us][ep_square] & BB_RANKS[4 if us else 3])
+        for from_square in scan_reversed(capturers):
+            moves.append(from_square | (ep_square << 6))
+
+    def _generate_castling(self, moves):
+        """Append legal castling moves (standard chess only)"""
+        us = self.turn
+        king = E1 if us else E8
+        if not self.bitboards[chess.KING] & self.occupied_co[us] & BB_SQUARES[king]:
+            return
+        them = not us
+        occupied = self.occupied
+        rights = self.castling_rights & self.bitboards[chess.ROOK] & self.occupied_co[us]
+        for rook in scan_reversed(rights & (BB_RANK_1 if us else BB_RANK_8)):
+            king_to = king + 2 if rook > king else king - 2
+            path = BETWEEN[king * 64 + rook]
+            if occupied & path:
+                continue
+            if any(self.attackers_mask(them, square, occupied)
+                   for square in (king, (king + king_to) >> 1, king_to)):
+                continue
+            moves.append(king | (king_to << 6))
+
+    def _slider_blockers(self, king):
+        """Our pieces pinned to the king"""
+        them = self.occupied_co[not self.turn]
+        rooks_and_queens = self.bitboards[chess.ROOK] | self.bitboards[chess.QUEEN]
+        bishops_and_queens = self.bitboards[chess.BISHOP] | self.bitboards[chess.QUEEN]
+        snipers = ((RANK_ATTACKS[king][0] | FILE_ATTACKS[king][0]) & rooks_and_queens |
+                   (DIAG_ATTACKS[king][0] | ANTI_ATTACKS[king][0]) & bishops_and_queens) & them
+        blockers = 0
+        for sniper in scan_reversed(snipers):
+            between = BETWEEN[king * 64 + sniper] & self.occupied
+            # Exactly one piece in between
+            if between and not between & (between - 1):
+                blockers |= between
+        return blockers & self.occupied_co[self.turn]
+
+    def _is_safe(self, king, blockers, code):
+        """Does a pseudo-legal move leave our king safe"""
+        from_square = code & 63
+        to_square = (code >> 6) & 63
+        if from_square == king:
+            if to_square - from_square in (2, -2):
+                return True  # castling is checked at generation
+            return not self.attackers_mask(not self.turn, to_square, self.occupied)
+        if to_square == self.ep_square and self.piece_types[from_square] == chess.PAWN:
+            self._push_code(code)
+            safe = not self.attackers_mask(self.turn, king, self.occupied)
+            self._pop_code()
+            return safe
+        return not blockers & BB_SQUARES[from_square] or bool(LINES[from_square * 64 + to_square] & BB_SQUARES[king])
+
+    def legal_codes(self):
+        """List of the legal moves as packed integers"""
+        moves = []
+        us = self.turn
+        king_mask = self.bitboards[chess.KING] & self.occupied_co[us]
+        if not king_mask:
+            self._generate_pseudo(moves, BB_ALL, BB_ALL)
+            return moves
+        king = king_mask.bit_length() - 1
+        blockers = self._slider_blockers(king)
+        checkers = self.attackers_mask(not us, king, self.occupied)
+        if checkers:
+            self._generate_evasions(moves, king, checkers)
+        else:
+            self._generate_pseudo(moves, BB_ALL, BB_ALL)
+        return [code for code in moves if self._is_safe(king, blockers, code)]
+
+    def _generate_evasions(self, moves, king, checkers):
+        """Append pseudo-legal check evasions"""
+        sliders = checkers & (self.bitboards[chess.BISHOP] | self.bitboards[chess.ROOK] | self.bitboards[chess.QUEEN])
+        attacked = 0
+        for checker in scan_reversed(sliders):
+            attacked |= LINES[king * 64 + checker] & ~BB_SQUARES[checker]
+
+        for to_square in scan_reversed(KING_ATTACKS[king] & ~self.occupied_co[self.turn] & ~attacked):
+            moves.append(king | (to_square << 6))
+
+        checker = checkers.bit_length() - 1
+        if BB_SQUARES[checker] == checkers:
+            # Capture or block a single checker
+            target = BETWEEN[king * 64 + checker] | checkers
+            self._generate_pseudo(moves, ~self.bitboards[chess.KING] & BB_ALL, target)
+            # Capture the checking pawn en passant
+            if self.ep_square is not None and not BB_SQUARES[self.ep_square] & target:
+                last_double = self.ep_square + (-8 if self.turn else 8)
+                if last_double == checker:
+                    self._generate_ep(moves, BB_ALL, BB_ALL)
+
+def perft(board, depth):
+    """Count the leaf nodes of the legal move tree of any board speaking packed moves"""
+    if depth == 0:
+        return 1
+    codes = board.legal_codes()
+    if depth == 1:
+        return len(codes)
+    nodes = 0
+    for code in codes:
+        board.push_code(code)
+        nodes += perft(board, depth - 1)
+        board.pop_code()
+    return nodes
+
+# Standard perft positions used to validate the generator against python-chess
+PERFT_POSITIONS = [
+    (chess.STARTING_FEN, 4),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 3),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 3),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", 3),
+]
+
+def python_chess_perft(board, depth):
+    """Reference perft on a chess.Board"""
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += python_chess_perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+if __name__ == "__main__":
+    import time
+    for fen, depth in PERFT_POSITIONS:
+        board = chess.Board(fen)
+        start_time = time.time()
+        nodes = perft(SearchBoard.from_board(board), depth)
+        bitboard_time = time.time() - start_time
+        start_time = time.time()
+        expected = python_chess_perft(board, depth)
+        reference_time = time.time() - start_time
+        status = "ok" if nodes == expected else f"MISMATCH (python-chess {expected})"
+        print(f"{fen} depth {depth}: {nodes} nodes {status} - "
+              f"bitboard {bitboard_time:.2f}s, python-chess {reference_time:.2f}s")
\ No newline at end of file
@@ -1,7 +1,336 @@
 import chess
+import chess.polyglot
+import json
 import random
 import time
 from collections import OrderedDict
+from types import MappingProxyType
+from Chess_Clock import TimeManager
+from Chess_Bitboard import (SearchBoard, CASTLING_CORNERS, ZOBRIST_CASTLING, ZOBRIST_TURN, static_exchange,
+                            ep_key, history_keys, move_key_delta)
+
+# Packed move layout: from-square in bits 0-5, to-square in bits 6-11 and the
+# promotion piece type (0 for none) in bits 12-14. Ordering keys add the
+# reversed generation index above MOVE_BITS and the score above SCORE_SHIFT,
+# so a plain integer sort orders moves by score and keeps ties stable.
+MOVE_BITS = 16
+MOVE_MASK = (1 << MOVE_BITS) - 1
+SCORE_SHIFT = 24
+MAX_PLY = 64
+MAX_MOVES = 256
+# Mate scores count down with the distance from the root, so a faster mate scores
+# higher; anything beyond MATE_THRESHOLD is a forced mate
+MATE_SCORE = 10000
+MATE_THRESHOLD = MATE_SCORE - 2 * MAX_PLY
+WINNING_CAPTURE_SCORE = 100000
+LOSING_CAPTURE_SCORE = -100000
+
+# Transposition table bound types; entries are stored for the side to move
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+FLIPPED_BOUND = (TT_EXACT, TT_UPPER, TT_LOWER)
+
+# Strength levels: the search deepens until the node or time budget runs out,
+# so time_budget (seconds) is the guaranteed p99 move latency. eval_noise
+# (centipawns, standard deviation) weakens the leaf evaluation.
+DIFFICULTY_LEVELS = {
+    'easy': {'max_depth': 3, 'node_budget': 400, 'time_budget': 0.25, 'eval_noise': 60, 'tt_size': 10000},
+    'medium': {'max_depth': 5, 'node_budget': 3000, 'time_budget': 1.0, 'eval_noise': 0, 'tt_size': 100000},
+    'hard': {'max_depth': 8, 'node_budget': 10000, 'time_budget': 3.0, 'eval_noise': 0, 'tt_size': 1000000},
+}
+
+# Share of the time budget the search may use; the rest covers unwinding and bookkeeping
+SEARCH_TIME_FRACTION = 0.95
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the node or time budget is spent"""
+
+def encode_move(move):
+    """Pack a chess.Move into a 16-bit integer"""
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+def _build_move_table():
+    """Precompute the chess.Move for every packed move code"""
+    table = [None] * (chess.KING << 12)
+    for promotion in (None, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        for from_square in chess.SQUARES:
+            for to_square in chess.SQUARES:
+                move = chess.Move(from_square, to_square, promotion)
+                table[encode_move(move)] = move
+    return table
+
+# Shared decode table so the search never allocates chess.Move objects. It is
+# filled in place on first use, keeping its ~20k moves out of import time.
+MOVE_TABLE = []
+
+def move_table():
+    """The shared decode table, built on first use"""
+    if not MOVE_TABLE:
+        MOVE_TABLE.extend(_build_move_table())
+    return MOVE_TABLE
+
+def decode_move(code):
+    """Unpack a 16-bit move code (score bits are ignored) into a chess.Move"""
+    return (MOVE_TABLE or move_table())[code & MOVE_MASK]
+
+class PackedBoard(chess.Board):
+    """
+    chess.Board speaking the packed move codes used by the search
+    push_code/pop_code keep a polyglot Zobrist key up to date incrementally
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # push_code and gives_check_code index MOVE_TABLE directly
+        move_table()
+        self.key = chess.polyglot.zobrist_hash(self)
+        self.key_history = []  # keys of earlier positions, oldest first
+
+    @classmethod
+    def from_board(cls, board):
+        """Copy a chess.Board, replaying its move stack so history is kept"""
+        packed = cls(board.root().fen())
+        for move in board.move_stack:
+            packed.push(move)
+        packed.key = chess.polyglot.zobrist_hash(packed)
+        packed.key_history = history_keys(board)
+        return packed
+
+    def legal_codes(self):
+        return [encode_move(move) for move in self.generate_legal_moves()]
+
+    def push_code(self, code):
+        key = (self.key ^ move_key_delta(self, code) ^ ep_key(self) ^ ZOBRIST_TURN ^
+               ZOBRIST_CASTLING[self.castling_rights & CASTLING_CORNERS])
+        self.key_history.append(self.key)
+        self.push(MOVE_TABLE[code])
+        self.key = key ^ ZOBRIST_CASTLING[self.castling_rights & CASTLING_CORNERS] ^ ep_key(self)
+
+    def pop_code(self):
+        self.pop()
+        self.key = self.key_history.pop()
+
+    def gives_check_code(self, code):
+        return self.gives_check(MOVE_TABLE[code])
+
+    def transposition_key(self):
+        return self.key
+
+def mate_in(score):
+    """Moves to mate for a mate score (negative when being mated), else None"""
+    if score >= MATE_THRESHOLD:
+        return (MATE_SCORE - score + 1) // 2
+    if score <= -MATE_THRESHOLD:
+        return -((MATE_SCORE + score) // 2)
+    return None
+
+def score_to_tt(score, ply):
+    """Re-base a mate score from distance-to-root to distance-from-this-node"""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+def score_from_tt(score, ply):
+    """Inverse of score_to_tt"""
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+# Piece values indexed by piece type
+PIECE_VALUES = (0, 100, 320, 330, 500, 900, 20000)
+
+# Piece-square tables for positional evaluation, starting from the rank farthest
+# from the piece's owner
+PAWN_TABLE = (
+    0,  0,  0,  0,  0,  0,  0,  0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5,  5, 10, 25, 25, 10,  5,  5,
+    0,  0,  0, 20, 20,  0,  0,  0,
+    5, -5,-10,  0,  0,-10, -5,  5,
+    5, 10, 10,-20,-20, 10, 10,  5,
+    0,  0,  0,  0,  0,  0,  0,  0
+)
+
+KNIGHT_TABLE = (
+    -50,-40,-30,-30,-30,-30,-40,-50,
+    -40,-20,  0,  0,  0,  0,-20,-40,
+    -30,  0, 10, 15, 15, 10,  0,-30,
+    -30,  5, 15, 20, 20, 15,  5,-30,
+    -30,  0, 15, 20, 20, 15,  0,-30,
+    -30,  5, 10, 15, 15, 10,  5,-30,
+    -40,-20,  0,  5,  5,  0,-20,-40,
+    -50,-40,-30,-30,-30,-30,-40,-50
+)
+
+BISHOP_TABLE = (
+    -20,-10,-10,-10,-10,-10,-10,-20,
+    -10,  0,  0,  0,  0,  0,  0,-10,
+    -10,  0, 10, 10, 10, 10,  0,-10,
+    -10,  5,  5, 10, 10,  5,  5,-10,
+    -10,  0,  5, 10, 10,  5,  0,-10,
+    -10,  5,  5,  5,  5,  5,  5,-10,
+    -10,  0,  5,  0,  0,  5,  0,-10,
+    -20,-10,-10,-10,-10,-10,-10,-20
+)
+
+ROOK_TABLE = (
+    0,  0,  0,  0,  0,  0,  0,  0,
+    5, 10, 10, 10, 10, 10, 10,  5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    0,  0,  0,  5,  5,  0,  0,  0
+)
+
+QUEEN_TABLE = (
+    -20,-10,-10, -5, -5,-10,-10,-20,
+    -10,  0,  0,  0,  0,  0,  0,-10,
+    -10,  0,  5,  5,  5,  5,  0,-10,
+    -5,  0,  5,  5,  5,  5,  0, -5,
+    0,  0,  5,  5,  5,  5,  0, -5,
+    -10,  5,  5,  5,  5,  5,  0,-10,
+    -10,  0,  5,  0,  0,  0,  0,-10,
+    -20,-10,-10, -5, -5,-10,-10,-20
+)
+
+KING_TABLE_MIDDLEGAME = (
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -20,-30,-30,-40,-40,-30,-30,-20,
+    -10,-20,-20,-20,-20,-20,-20,-10,
+    20, 20,  0,  0,  0,  0, 20, 20,
+    20, 30, 10,  0,  0, 10, 30, 20
+)
+
+KING_TABLE_ENDGAME = (
+    -50,-40,-30,-20,-20,-30,-40,-50,
+    -30,-20,-10,  0,  0,-10,-20,-30,
+    -30,-10, 20, 30, 30, 20,-10,-30,
+    -30,-10, 30, 40, 40, 30,-10,-30,
+    -30,-10, 30, 40, 40, 30,-10,-30,
+    -30,-10, 20, 30, 30, 20,-10,-30,
+    -30,-30,  0,  0,  0,  0,-30,-30,
+    -50,-30,-30,-30,-30,-30,-30,-50
+)
+
+# Tables by name, as in parameter files
+EVAL_TABLES = MappingProxyType({
+    'pawn': PAWN_TABLE,
+    'knight': KNIGHT_TABLE,
+    'bishop': BISHOP_TABLE,
+    'rook': ROOK_TABLE,
+    'queen': QUEEN_TABLE,
+    'king_middlegame': KING_TABLE_MIDDLEGAME,
+    'king_endgame': KING_TABLE_ENDGAME,
+})
+
+# Weights of the secondary evaluation terms
+EVAL_WEIGHTS = MappingProxyType({
+    'mobility': 0.1,
+    'king_safety': 0.2,
+    'pawn_structure': 0.1,
+})
+
+# Bounds on each secondary term (before weighting). The terms are clamped to
+# them, so together they are a hard limit on how far the secondary terms can
+# move the material and piece-square score.
+TERM_BOUNDS = MappingProxyType({
+    'mobility': 120,
+    'king_safety': 80,
+    'pawn_structure': 160,
+})
+
+def clamp_term(term, score):
+    """Clamp a secondary term's score to its TERM_BOUNDS entry"""
+    bound = TERM_BOUNDS[term]
+    return max(-bound, min(bound, score))
+
+# Static evaluations kept per bot before the eval cache is cleared
+EVAL_CACHE_SIZE = 1 << 16
+
+# Flat piece-square tables hold the king's endgame table after the six piece types
+KING_ENDGAME = chess.KING + 1
+SQUARE_TABLE_ORDER = ('pawn', 'knight', 'bishop', 'rook', 'queen', 'king_middlegame', 'king_endgame')
+
+def build_square_tables(tables):
+    """
+    Flat per-colour piece-square tables, indexed [color][piece * 64 + square]
+    The mirroring is done here once: white reads a table at 63 - square, black at square.
+    """
+    ordered = [tables[name] for name in SQUARE_TABLE_ORDER]
+    black = (0,) * 64 + tuple(value for table in ordered for value in table)
+    white = (0,) * 64 + tuple(table[63 - square] for table in ordered for square in range(64))
+    return (black, white)
+
+SQUARE_TABLES = build_square_tables(EVAL_TABLES)
+
+# King zone of each square: the square itself and its neighbours
+KING_ZONES = tuple(chess.BB_KING_ATTACKS[square] | chess.BB_SQUARES[square] for square in chess.SQUARES)
+
+def _pawn_shields(color):
+    """Squares directly and diagonally in front of a king on each square, for one colour"""
+    step = 1 if color == chess.WHITE else -1
+    return tuple(chess.BB_KING_ATTACKS[square] & chess.BB_RANKS[chess.square_rank(square) + step]
+                 if 0 <= chess.square_rank(square) + step <= 7 else 0
+                 for square in chess.SQUARES)
+
+# Indexed [color][king square]
+PAWN_SHIELDS = (_pawn_shields(chess.BLACK), _pawn_shields(chess.WHITE))
+SHIELD_PAWN_BONUS = 10
+
+# Penalty per king zone square attacked, by attacking piece type
+KING_ATTACK_WEIGHTS = (0, 0, 3, 3, 4, 6, 0)
+KING_ATTACKERS = (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+
+def _zone_reach(lines):
+    """Squares from which a piece moving along lines (empty-board masks by square) can reach each king zone"""
+    reach = []
+    for zone in KING_ZONES:
+        mask = 0
+        for square in chess.scan_reversed(zone):
+            mask |= lines[square]
+        reach.append(mask)
+    return tuple(reach)
+
+# Pieces outside these squares cannot attack the king zone, whatever blocks them;
+# indexed [piece_type][king square]
+_DIAGONALS = [chess.BB_DIAG_ATTACKS[square][0] for square in chess.SQUARES]
+_LINES = [chess.BB_RANK_ATTACKS[square][0] | chess.BB_FILE_ATTACKS[square][0] for square in chess.SQUARES]
+KING_ZONE_REACH = (None, None, _zone_reach(chess.BB_KNIGHT_ATTACKS), _zone_reach(_DIAGONALS),
+                   _zone_reach(_LINES), _zone_reach([d | l for d, l in zip(_DIAGONALS, _LINES)]))
+
+# Boards the search can run on; the API boundary always uses chess.Board
+SEARCH_BACKENDS = {
+    'python-chess': PackedBoard,
+    'bitboard': SearchBoard,
+}
+
+class Evaluator:
+    """
+    Interface for pluggable evaluators (see Chess_NNUE.py)
+    attach() is called with every search board before the search uses it, so
+    an evaluator can hook push_code/pop_code to keep incremental state.
+    evaluate() scores the position for the side to move. It may return early
+    once it can prove the score is outside the (alpha, beta) window, but the
+    value must then be a true bound, and the tightest one it can prove: at most
+    alpha only if the true score is no higher, at least beta only if it is no
+    lower. The search stores these values as transposition table bounds.
+    An evaluator with state serves one bot at a time.
+    """
+    def attach(self, board):
+        pass
+
+    def evaluate(self, board, alpha=float('-inf'), beta=float('inf')):
+        raise NotImplementedError
 
 class LRUCache:
     """Limited-size LRU cache for transposition table"""
@@ -22,280 +351,580 @@ class LRUCache:
             self.cache.popitem(last=False)
 
 class ChessBot:
-    def __init__(self, difficulty='medium'):
+    __slots__ = (
+        'difficulty', 'backend', 'max_depth', 'node_budget', 'time_budget', 'eval_noise',
+        'transposition_table', 'piece_values', 'tables', 'square_tables', 'eval_weights', 'lazy_margin',
+        'eval_cache',
+        'evaluator', 'evaluate', 'root_moves', 'nodes_evaluated', 'cache_hits', 'start_time',
+        'search_depth', 'last_score', 'iterations', 'node_limit', 'deadline',
+    )
+    
+    def __init__(self, difficulty='medium', backend='python-chess', tt_file=None, tt_read_only=False,
+                 node_budget=None, time_budget=None, eval_noise=None, max_depth=None, params_file=None,
+                 evaluator=None):
         """
         Initialize chess bot with difficulty level
-        :param difficulty: 'easy', 'medium', or 'hard'
+        :param difficulty: 'easy', 'medium', or 'hard' (see DIFFICULTY_LEVELS)
+        :param backend: search board, 'python-chess' or the leaner 'bitboard'
+        :param tt_file: keep the transposition table in this memory-mapped file (needs numpy)
+        :param tt_read_only: share tt_file read-mostly; new entries are not written back
+        :param node_budget: override the level's nodes per move
+        :param time_budget: override the level's seconds per move
+        :param eval_noise: override the level's evaluation noise
+        :param max_depth: override the level's depth cap
+        :param params_file: load tuned evaluation parameters from this JSON file (see Chess_Tuner.py)
+        :param evaluator: Evaluator used instead of the classical evaluate_board
         """
+        if backend not in SEARCH_BACKENDS:
+            raise ValueError(f"Unknown search backend: {backend}")
+        if difficulty not in DIFFICULTY_LEVELS:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
         self.difficulty = difficulty
-        # Set search depth based on difficulty
-        if difficulty == 'easy':
-            self.max_depth = 2
-        elif difficulty == 'medium':
-            self.max_depth = 3
-        else:  # hard
-            self.max_depth = 4
-            
+        self.backend = backend
+        
+        # Search limits based on difficulty
+        level = DIFFICULTY_LEVELS[difficulty]
+        self.max_depth = max_depth if max_depth is not None else level['max_depth']
+        self.node_budget = node_budget if node_budget is not None else level['node_budget']
+        self.time_budget = time_budget if time_budget is not None else level['time_budget']
+        self.eval_noise = eval_noise if eval_noise is not None else level['eval_noise']
+        
         # Initialize transposition table with appropriate size for each difficulty
-        if difficulty == 'easy':
-            self.transposition_table = LRUCache(10000)  # Smaller cache for easy
-        elif difficulty == 'medium':
-            self.transposition_table = LRUCache(100000)  # Medium-sized cache
-        else:  # hard
-            self.transposition_table = LRUCache(1000000)  # Large cache for hard
+        tt_size = level['tt_size']
+        if tt_file:
+            # Persistent table, only imported when asked for since it needs numpy
+            from Chess_Transposition import NumpyTranspositionTable
+            self.transposition_table = NumpyTranspositionTable(tt_size, tt_file, read_only=tt_read_only)
+        else:
+            self.transposition_table = LRUCache(tt_size)
             
-        # Piece values
-        self.piece_values = {
-            chess.PAWN: 100,
-            chess.KNIGHT: 320,
-            chess.BISHOP: 330,
-            chess.ROOK: 500,
-            chess.QUEEN: 900,
-            chess.KING: 20000
-        }
+        # Evaluation parameters, shared read-only with every other bot until load_params
+        self.piece_values = PIECE_VALUES
+        self.tables = EVAL_TABLES
+        self.square_tables = SQUARE_TABLES
         
-        # Piece-square tables for positional evaluation
-        self.pawn_table = [
-            0,  0,  0,  0,  0,  0,  0,  0,
-            50, 50, 50, 50, 50, 50, 50, 50,
-            10, 10, 20, 30, 30, 20, 10, 10,
-            5,  5, 10, 25, 25, 10,  5,  5,
-            0,  0,  0, 20, 20,  0,  0,  0,
-            5, -5,-10,  0,  0,-10, -5,  5,
-            5, 10, 10,-20,-20, 10, 10,  5,
-            0,  0,  0,  0,  0,  0,  0,  0
-        ]
-        
-        self.knight_table = [
-            -50,-40,-30,-30,-30,-30,-40,-50,
-            -40,-20,  0,  0,  0,  0,-20,-40,
-            -30,  0, 10, 15, 15, 10,  0,-30,
-            -30,  5, 15, 20, 20, 15,  5,-30,
-            -30,  0, 15, 20, 20, 15,  0,-30,
-            -30,  5, 10, 15, 15, 10,  5,-30,
-            -40,-20,  0,  5,  5,  0,-20,-40,
-            -50,-40,-30,-30,-30,-30,-40,-50,
-        ]
-        
-        self.bishop_table = [
-            -20,-10,-10,-10,-10,-10,-10,-20,
-            -10,  0,  0,  0,  0,  0,  0,-10,
-            -10,  0, 10, 10, 10, 10,  0,-10,
-            -10,  5,  5, 10, 10,  5,  5,-10,
-            -10,  0,  5, 10, 10,  5,  0,-10,
-            -10,  5,  5,  5,  5,  5,  5,-10,
-            -10,  0,  5,  0,  0,  5,  0,-10,
-            -20,-10,-10,-10,-10,-10,-10,-20,
-        ]
-        
-        self.rook_table = [
-            0,  0,  0,  0,  0,  0,  0,  0,
-            5, 10, 10, 10, 10, 10, 10,  5,
-            -5,  0,  0,  0,  0,  0,  0, -5,
-            -5,  0,  0,  0,  0,  0,  0, -5,
-            -5,  0,  0,  0,  0,  0,  0, -5,
-            -5,  0,  0,  0,  0,  0,  0, -5,
-            -5,  0,  0,  0,  0,  0,  0, -5,
-            0,  0,  0,  5,  5,  0,  0,  0
-        ]
-        
-        self.queen_table = [
-            -20,-10,-10, -5, -5,-10,-10,-20,
-            -10,  0,  0,  0,  0,  0,  0,-10,
-            -10,  0,  5,  5,  5,  5,  0,-10,
-            -5,  0,  5,  5,  5,  5,  0, -5,
-            0,  0,  5,  5,  5,  5,  0, -5,
-            -10,  5,  5,  5,  5,  5,  0,-10,
-            -10,  0,  5,  0,  0,  0,  0,-10,
-            -20,-10,-10, -5, -5,-10,-10,-20
-        ]
-        
-        self.king_table_middlegame = [
-            -30,-40,-40,-50,-50,-40,-40,-30,
-            -30,-40,-40,-50,-50,-40,-40,-30,
-            -30,-40,-40,-50,-50,-40,-40,-30,
-            -30,-40,-40,-50,-50,-40,-40,-30,
-            -20,-30,-30,-40,-40,-30,-30,-20,
-            -10,-20,-20,-20,-20,-20,-20,-10,
-            20, 20,  0,  0,  0,  0, 20, 20,
-            20, 30, 10,  0,  0, 10, 30, 20
-        ]
-        
-        self.king_table_endgame = [
-            -50,-40,-30,-20,-20,-30,-40,-50,
-            -30,-20,-10,  0,  0,-10,-20,-30,
-            -30,-10, 20, 30, 30, 20,-10,-30,
-            -30,-10, 30, 40, 40, 30,-10,-30,
-            -30,-10, 30, 40, 40, 30,-10,-30,
-            -30,-10, 20, 30, 30, 20,-10,-30,
-            -30,-30,  0,  0,  0,  0,-30,-30,
-            -50,-30,-30,-30,-30,-30,-30,-50
-        ]
-        
-        self.piece_tables = {
-            chess.PAWN: self.pawn_table,
-            chess.KNIGHT: self.knight_table,
-            chess.BISHOP: self.bishop_table,
-            chess.ROOK: self.rook_table,
-            chess.QUEEN: self.queen_table,
-            chess.KING: self.king_table_middlegame
-        }
+        self.eval_weights = EVAL_WEIGHTS
+        self.lazy_margin = self.term_margin()
+        
+        # Static evaluations by Zobrist key, reused whatever the depth or window
+        self.eval_cache = {}
+        
+        if params_file:
+            self.load_params(params_file)
+        
+        # Static evaluation used by the search, for the side to move
+        self.evaluator = evaluator
+        self.evaluate = evaluator.evaluate if evaluator is not None else self.evaluate_board
+        
+        # Ordering keys of the root moves from the latest search_root, best first
+        self.root_moves = []
         
         # Statistics for performance monitoring
         self.nodes_evaluated = 0
         self.cache_hits = 0
         self.start_time = 0
+        self.search_depth = 0
+        self.last_score = None
+        # (depth, move, score, seconds, nodes) for each completed iteration of the last search
+        self.iterations = []
+        
+        # Search limits of the move in progress
+        self.node_limit = 0
+        self.deadline = 0
     
-    def get_best_move(self, board):
-        """Find the best move using minimax with alpha-beta pruning and transposition table"""
-        self.nodes_evaluated = 0
-        self.cache_hits = 0
-        self.start_time = time.time()
+    def get_best_move(self, board, time_left=None, increment=0.0):
+        """
+        Find the best move by iterative deepening minimax within the node and time budget
+        Under a game clock (time_left and increment in seconds) a TimeManager sets
+        the move's time instead of the level's time_budget. A forced move is
+        played without searching.
+        """
+        if board.legal_moves.count() == 1:
+            self.start_search()
+            self.print_search_stats()
+            return next(iter(board.legal_moves))
+        
+        time_manager = None
+        if time_left is not None:
+            time_manager = TimeManager(time_left, increment, board.fullmove_number - 1)
+        self.start_search(time_manager.maximum if time_manager else None)
         
-        # For easy difficulty, sometimes make a random legal move
-        if self.difficulty == 'easy' and random.random() < 0.2:
-            legal_moves = list(board.legal_moves)
-            return random.choice(legal_moves)
+        # Search on a private copy in the selected backend, so an aborted search leaves no trace
+        search_board = self.make_search_board(board)
         
         best_move = None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best_move, best_eval = self.search_root(search_board, depth, best_move)
+            except SearchTimeout:
+                break
+            self.search_depth = depth
+            self.last_score = best_eval
+            self.iterations.append((depth, decode_move(best_move), best_eval,
+                                    time.time() - self.start_time, self.nodes_evaluated))
+            # Stop early once a forced mate is found; iterative deepening finds the fastest first
+            if abs(best_eval) >= MATE_THRESHOLD:
+                break
+            # Under a clock, stop when another iteration would overrun this move's share
+            if time_manager:
+                elapsed = time.time() - self.start_time
+                time_manager.update(best_move, elapsed - (self.iterations[-2][3] if depth > 1 else 0.0))
+                if time_manager.should_stop(elapsed):
+                    break
+        
+        # Out of budget before depth 1 finished: take the best-ordered root move
+        if best_move is None and any(board.legal_moves):
+            best_move = self.root_moves[0] & MOVE_MASK
+        
+        self.print_search_stats()
+        
+        # Convert back to chess.Move only at the API boundary
+        return decode_move(best_move) if best_move is not None else random.choice(list(board.legal_moves))
+    
+    def analyze(self, board, num_lines=3):
+        """
+        Multi-PV analysis within the node and time budget
+        Returns up to num_lines (move, score, pv) tuples, best first, from the
+        deepest iteration completed for every line. Scores are from the side to
+        move's point of view; each pass shares the transposition table and
+        excludes the moves already found.
+        """
+        self.start_search()
+        search_board = self.make_search_board(board)
+        
+        lines = []
+        for depth in range(1, self.max_depth + 1):
+            depth_lines = []
+            excluded = set()
+            try:
+                for i in range(num_lines):
+                    previous_best = lines[i][0] if i < len(lines) else None
+                    move, score = self.search_root(search_board, depth, previous_best, excluded)
+                    if move is None:
+                        break
+                    excluded.add(move)
+                    depth_lines.append((move, score))
+            except SearchTimeout:
+                break
+            lines = depth_lines
+            self.search_depth = depth
+            self.last_score = lines[0][1] if lines else None
+        
+        self.print_search_stats()
+        
+        # A timed-out search leaves moves on the board, so read the lines from a fresh copy
+        search_board = self.make_search_board(board)
+        return [(decode_move(move), score, self.principal_variation(search_board, move))
+                for move, score in lines]
+    
+    def principal_variation(self, board, move, max_length=MAX_PLY):
+        """Follow the transposition table's best moves from a root move"""
+        pv = [move]
+        board.push_code(move)
+        seen = {board.transposition_key()}
+        while len(pv) < max_length:
+            entry = self.transposition_table.get(self.get_board_hash(board))
+            if not entry or not entry[3] or entry[3] not in board.legal_codes():
+                break
+            board.push_code(entry[3])
+            pv.append(entry[3])
+            if board.transposition_key() in seen:
+                break
+            seen.add(board.transposition_key())
+        for _ in pv:
+            board.pop_code()
+        return [decode_move(code) for code in pv]
+    
+    def start_search(self, time_limit=None):
+        """
+        Reset the statistics and start the node and time budget
+        :param time_limit: seconds the search may take, instead of the level's time_budget
+        """
+        self.nodes_evaluated = 0
+        self.cache_hits = 0
+        self.start_time = time.time()
+        self.node_limit = self.node_budget
+        if time_limit is None:
+            time_limit = self.time_budget * SEARCH_TIME_FRACTION
+        self.deadline = self.start_time + time_limit
+        self.search_depth = 0
+        self.last_score = None
+        self.iterations = []
+    
+    def print_search_stats(self):
+        end_time = time.time()
+        print(f"Move evaluation complete:")
+        print(f"- Depth reached: {self.search_depth}")
+        if self.last_score is not None and mate_in(self.last_score):
+            print(f"- Mate in {mate_in(self.last_score)}")
+        print(f"- Nodes evaluated: {self.nodes_evaluated}")
+        print(f"- Cache hits: {self.cache_hits}")
+        print(f"- Time taken: {end_time - self.start_time:.2f} seconds")
+        print(f"- Nodes per second: {self.nodes_evaluated / max(end_time - self.start_time, 1e-6):.0f}")
+    
+    def search_root(self, board, depth, previous_best=None, excluded=()):
+        """
+        Search the root moves to the given depth, trying the previous iteration's best move first
+        :param excluded: root moves to skip (lines already found by a multi-PV search)
+        """
         alpha = float('-inf')
         beta = float('inf')
         max_eval = float('-inf')
+        best_move = None
         
         # Order moves to improve alpha-beta pruning efficiency
-        moves = self.order_moves(board)
+        keys = self.root_moves = self.order_moves(board)
+        if previous_best is not None:
+            for i, key in enumerate(keys):
+                if key & MOVE_MASK == previous_best:
+                    keys.insert(0, keys.pop(i))
+                    break
         
-        for move in moves:
-            board.push(move)
-            eval = self.minimax(board, self.max_depth - 1, alpha, beta, False)
-            board.pop()
+        for key in keys:
+            code = key & MOVE_MASK
+            if code in excluded:
+                continue
+            board.push_code(code)
+            eval = self.minimax(board, depth - 1, alpha, beta, False, 1)
+            board.pop_code()
             
             if eval > max_eval:
                 max_eval = eval
-                best_move = move
+                best_move = code
             
             alpha = max(alpha, eval)
         
-        end_time = time.time()
-        print(f"Move evaluation complete:")
-        print(f"- Nodes evaluated: {self.nodes_evaluated}")
-        print(f"- Cache hits: {self.cache_hits}")
-        print(f"- Time taken: {end_time - self.start_time:.2f} seconds")
-        print(f"- Nodes per second: {self.nodes_evaluated / (end_time - self.start_time):.0f}")
-        
-        return best_move if best_move else random.choice(list(board.legal_moves))
+        return best_move, max_eval
     
-    def minimax(self, board, depth, alpha, beta, is_maximizing):
+    def make_search_board(self, board):
+        """Copy a chess.Board into the configured search backend"""
+        search_board = SEARCH_BACKENDS[self.backend].from_board(board)
+        if self.evaluator is not None:
+            self.evaluator.attach(search_board)
+        return search_board
+    
+    def minimax(self, board, depth, alpha, beta, is_maximizing, ply=0):
         """Minimax algorithm with alpha-beta pruning and transposition table"""
         self.nodes_evaluated += 1
+        if self.nodes_evaluated > self.node_limit or time.time() >= self.deadline:
+            raise SearchTimeout()
         
-        # Check for terminal state
-        if board.is_checkmate():
-            return -10000 if is_maximizing else 10000
-        elif board.is_stalemate() or board.is_insufficient_material():
+        # Repeated positions are draws; checked before the TT since they depend on the path
+        if self.is_repetition(board, ply):
             return 0
         
+        # Mate distance pruning: no line from here beats mating next move or
+        # loses faster than being mated now
+        if is_maximizing:
+            alpha = max(alpha, -(MATE_SCORE - ply))
+            beta = min(beta, MATE_SCORE - ply - 1)
+            if alpha >= beta:
+                return alpha
+        else:
+            alpha = max(alpha, -(MATE_SCORE - ply - 1))
+            beta = min(beta, MATE_SCORE - ply)
+            if alpha >= beta:
+                return beta
+        
+        original_alpha = alpha
+        original_beta = beta
+        
         # Transposition table lookup
         board_hash = self.get_board_hash(board)
         cached_entry = self.transposition_table.get(board_hash)
         if cached_entry and cached_entry[0] >= depth:
-            self.cache_hits += 1
-            return cached_entry[1]
+            _, cached_eval, bound, _ = cached_entry
+            cached_eval = score_from_tt(cached_eval, ply)
+            if not is_maximizing:
+                cached_eval, bound = -cached_eval, FLIPPED_BOUND[bound]
+            if (bound == TT_EXACT or (bound == TT_LOWER and cached_eval >= beta) or
+                    (bound == TT_UPPER and cached_eval <= alpha)):
+                self.cache_hits += 1
+                return cached_eval
         
-        # Leaf node evaluation
+        # Generate the legal moves once; an empty list is mate or stalemate
+        codes = board.legal_codes()
+        if not codes:
+            if board.is_check():
+                return -(MATE_SCORE - ply) if is_maximizing else MATE_SCORE - ply
+            return 0
+        if self.is_insufficient_material(board) or board.halfmove_clock >= 100:
+            return 0
+        
+        # Leaf node: resolve pending captures before trusting the static evaluation
         if depth == 0:
-            evaluation = self.evaluate_board(board)
-            self.transposition_table.put(board_hash, (depth, evaluation))
+            evaluation = self.quiescence(board, alpha, beta, is_maximizing, ply, codes)
+            self.store_transposition(board_hash, depth, evaluation,
+                                     self.bound_type(evaluation, original_alpha, original_beta), is_maximizing, 0, ply)
             return evaluation
         
         # Order moves to improve alpha-beta pruning efficiency
-        moves = self.order_moves(board)
+        keys = self.order_moves(board, codes)
         
         if is_maximizing:
             max_eval = float('-inf')
-            for move in moves:
-                board.push(move)
-                eval = self.minimax(board, depth - 1, alpha, beta, False)
-                board.pop()
-                max_eval = max(max_eval, eval)
+            best_move = 0
+            for key in keys:
+                code = key & MOVE_MASK
+                board.push_code(code)
+                eval = self.minimax(board, depth - 1, alpha, beta, False, ply + 1)
+                board.pop_code()
+                if eval > max_eval:
+                    max_eval = eval
+                    best_move = code
                 alpha = max(alpha, eval)
                 if beta <= alpha:
                     break
-            self.transposition_table.put(board_hash, (depth, max_eval))
+            self.store_transposition(board_hash, depth, max_eval,
+                                     self.bound_type(max_eval, original_alpha, original_beta), True, best_move, ply)
             return max_eval
         else:
             min_eval = float('inf')
-            for move in moves:
-                board.push(move)
-                eval = self.minimax(board, depth - 1, alpha, beta, True)
-                board.pop()
-                min_eval = min(min_eval, eval)
+            best_move = 0
+            for key in keys:
+                code = key & MOVE_MASK
+                board.push_code(code)
+                eval = self.minimax(board, depth - 1, alpha, beta, True, ply + 1)
+                board.pop_code()
+                if eval < min_eval:
+                    min_eval = eval
+                    best_move = code
                 beta = min(beta, eval)
                 if beta <= alpha:
                     break
-            self.transposition_table.put(board_hash, (depth, min_eval))
+            self.store_transposition(board_hash, depth, min_eval,
+                                     self.bound_type(min_eval, original_alpha, original_beta), False, best_move, ply)
             return min_eval
     
-    def order_moves(self, board):
-        """Order moves to improve alpha-beta pruning efficiency"""
-        # Simple move ordering: captures first, then other moves
-        moves = list(board.legal_moves)
-        move_scores = []
+    def quiescence(self, board, alpha, beta, is_maximizing, ply, codes=None):
+        """
+        Capture-only search below the horizon
+        The side to move may stand pat on the static evaluation or try a capture;
+        captures that lose material by static exchange are pruned.
+        :param codes: legal moves already generated for this node, if any
+        """
+        # Stand pat (the evaluation scores for the side to move, within its own window)
+        if is_maximizing:
+            stand_pat = self.evaluate(board, alpha, beta)
+        else:
+            stand_pat = self.evaluate(board, -beta, -alpha)
+        if self.eval_noise:
+            stand_pat += random.gauss(0, self.eval_noise)
+        if not is_maximizing:
+            stand_pat = -stand_pat
+        if ply >= MAX_PLY - 1:
+            return stand_pat
+        if is_maximizing:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
         
-        for move in moves:
+        best_eval = stand_pat
+        for key in self.order_captures(board, codes):
+            self.nodes_evaluated += 1
+            if self.nodes_evaluated > self.node_limit or time.time() >= self.deadline:
+                raise SearchTimeout()
+            board.push_code(key & MOVE_MASK)
+            eval = self.quiescence(board, alpha, beta, not is_maximizing, ply + 1)
+            board.pop_code()
+            if is_maximizing:
+                best_eval = max(best_eval, eval)
+                alpha = max(alpha, eval)
+            else:
+                best_eval = min(best_eval, eval)
+                beta = min(beta, eval)
+            if beta <= alpha:
+                break
+        return best_eval
+    
+    def order_captures(self, board, codes=None):
+        """
+        Ordering keys of the captures that do not lose material, best first
+        :param codes: legal moves already generated for this node, if any
+        """
+        if codes is None:
+            codes = board.legal_codes()
+        keys = []
+        for code in codes:
+            to_square = (code >> 6) & 63
+            victim_type = board.piece_type_at(to_square)
+            if victim_type is None:
+                if to_square != board.ep_square or board.piece_type_at(code & 63) != chess.PAWN:
+                    continue
+                victim_type = chess.PAWN
+            if static_exchange(board, code, self.piece_values) < 0:
+                continue
+            score = 10 * self.piece_values[victim_type] - self.piece_values[board.piece_type_at(code & 63)]
+            keys.append((score << SCORE_SHIFT) | ((MAX_MOVES - 1 - len(keys)) << MOVE_BITS) | code)
+        keys.sort(reverse=True)
+        return keys
+    
+    def is_repetition(self, board, ply):
+        """
+        Repetition test on the board's Zobrist key history
+        A position repeated inside the search tree is scored as a draw straight
+        away; one from before the root must already have occurred twice. Only
+        plies since the last irreversible move are scanned.
+        """
+        history = board.key_history
+        key = board.key
+        count = 0
+        # Only positions with the same side to move can repeat
+        for i in range(2, min(board.halfmove_clock, len(history)) + 1, 2):
+            if history[-i] == key:
+                if i <= ply:
+                    return True
+                count += 1
+                if count == 2:
+                    return True
+        return False
+    
+    def bound_type(self, value, alpha, beta):
+        """Classify a fail-soft alpha-beta result"""
+        if value <= alpha:
+            return TT_UPPER
+        if value >= beta:
+            return TT_LOWER
+        return TT_EXACT
+    
+    def store_transposition(self, board_hash, depth, value, bound, is_maximizing, best_move, ply):
+        """
+        Store a result for the side to move, so entries hold whichever colour the bot plays
+        Mate scores are stored as distances from this node rather than from the root.
+        """
+        if not is_maximizing:
+            value, bound = -value, FLIPPED_BOUND[bound]
+        self.transposition_table.put(board_hash, (depth, score_to_tt(value, ply), bound, best_move))
+    
+    def save_transposition_table(self):
+        """Write a file-backed transposition table to disk; read-only and in-memory tables are left alone"""
+        if hasattr(self.transposition_table, 'save') and not self.transposition_table.read_only:
+            self.transposition_table.save()
+    
+    def eval_params(self):
+        """Evaluation parameters as a JSON-ready dict, in the format load_params reads"""
+        return {
+            'piece_values': {chess.piece_name(piece_type): self.piece_values[piece_type]
+                             for piece_type in chess.PIECE_TYPES[:-1]},
+            'tables': {name: list(table) for name, table in self.tables.items()},
+            'weights': dict(self.eval_weights),
+        }
+    
+    def load_params(self, path):
+        """
+        Replace the evaluation parameters with those in a JSON parameter file
+        The bot gets its own copies; the shared module tables are left untouched.
+        """
+        with open(path) as f:
+            params = json.load(f)
+        piece_values = list(self.piece_values)
+        for name, value in params.get('piece_values', {}).items():
+            # Move ordering packs piece values into integer keys
+            piece_values[chess.PIECE_NAMES.index(name)] = int(round(value))
+        self.piece_values = tuple(piece_values)
+        tables = dict(self.tables)
+        for name, values in params.get('tables', {}).items():
+            if name not in tables:
+                raise ValueError(f"Unknown table {name!r} in {path}")
+            if len(values) != 64:
+                raise ValueError(f"Table {name!r} in {path} has {len(values)} entries, expected 64")
+            tables[name] = tuple(values)
+        self.tables = MappingProxyType(tables)
+        self.square_tables = build_square_tables(tables)
+        self.eval_weights = MappingProxyType({**self.eval_weights, **params.get('weights', {})})
+        self.lazy_margin = self.term_margin()
+        self.eval_cache.clear()
+    
+    def term_margin(self):
+        """Bound on the weighted mobility, king safety and pawn structure terms together"""
+        return sum(abs(self.eval_weights[term]) * bound for term, bound in TERM_BOUNDS.items())
+    
+    def order_moves(self, board, codes=None):
+        """
+        Order moves to improve alpha-beta pruning efficiency
+        Returns ordering keys, best first: the score in the high bits, then the
+        generation order as a tie-break, then the packed move (key & MOVE_MASK)
+        :param codes: legal moves already generated for this node, if any
+        """
+        # Captures that win or hold material first, then quiet moves, then losing captures
+        keys = []
+        if codes is None:
+            codes = board.legal_codes()
+        
+        for code in codes:
             score = 0
+            from_square = code & 63
+            to_square = (code >> 6) & 63
             # Prioritize captures by MVV-LVA (Most Valuable Victim - Least Valuable Aggressor)
-            if board.is_capture(move):
-                victim_piece = board.piece_at(move.to_square)
-                if victim_piece:
-                    victim_value = self.piece_values.get(victim_piece.piece_type, 0)
-                    aggressor = board.piece_at(move.from_square)
-                    if aggressor:
-                        aggressor_value = self.piece_values.get(aggressor.piece_type, 0)
-                        score = 10 * victim_value - aggressor_value
+            victim_type = board.piece_type_at(to_square)
+            aggressor_type = board.piece_type_at(from_square)
+            if victim_type:
+                score = 10 * self.piece_values[victim_type] - self.piece_values[aggressor_type]
+            elif to_square == board.ep_square and aggressor_type == chess.PAWN:
+                # En passant capture
+                score = 100  # Pawn value
+            # Static exchange splits captures into winning ones, ahead of every quiet move,
+            # and losing ones, behind every quiet move
+            if score:
+                if static_exchange(board, code, self.piece_values) < 0:
+                    score = LOSING_CAPTURE_SCORE
                 else:
-                    # En passant capture
-                    score = 100  # Pawn value
+                    score += WINNING_CAPTURE_SCORE
             
             # Prioritize promotions
-            if move.promotion:
-                score += self.piece_values[move.promotion]
+            promotion = code >> 12
+            if promotion:
+                score += self.piece_values[promotion]
             
             # Check and checkmate threats (simple approximation)
-            board.push(move)
-            if board.is_check():
+            if board.gives_check_code(code):
                 score += 50
-            board.pop()
             
-            move_scores.append((move, score))
+            keys.append((score << SCORE_SHIFT) | ((MAX_MOVES - 1 - len(keys)) << MOVE_BITS) | code)
         
-        # Sort moves by score in descending order
-        move_scores.sort(key=lambda x: x[1], reverse=True)
-        return [move for move, _ in move_scores]
+        # Scores live in the high bits, so a plain integer sort in place orders by score
+        keys.sort(reverse=True)
+        return keys
     
     def get_board_hash(self, board):
         """Generate a unique hash for the board position"""
-        return board.fen()
+        return board.transposition_key()
     
-    def evaluate_board(self, board):
+    def evaluate_board(self, board, alpha=float('-inf'), beta=float('inf')):
         """
-        Evaluate the board position
-        Positive score favors white, negative score favors black
+        Evaluate the board position for the side to move
+        Mate and draws are detected by the search before a leaf is evaluated.
+        With a window, the slower terms are skipped when material and position
+        alone are further outside (alpha, beta) than those terms can reach;
+        the score returned is then only a bound, and is not cached.
         """
-        if board.is_checkmate():
-            # If checkmate, return a high score favoring the winner
-            return -10000 if board.turn else 10000
-            
-        if board.is_stalemate() or board.is_insufficient_material():
-            return 0  # Draw
-            
+        # Search boards carry a Zobrist key; a plain chess.Board is evaluated uncached
+        board_hash = board.transposition_key() if hasattr(board, 'transposition_key') else None
+        cached = self.eval_cache.get(board_hash)
+        if cached is not None:
+            return cached
+        
         # Material evaluation
         material_score = self.evaluate_material(board)
         
         # Positional evaluation
         positional_score = self.evaluate_position(board)
         
-        # Mobility evaluation (number of legal moves)
+        # Lazy exit when the remaining terms cannot bring the score into the window
+        fast_score = material_score + positional_score
+        if board.turn == chess.BLACK:
+            fast_score = -fast_score
+        # The bound returned is the closest the full score could be to the window
+        if fast_score + self.lazy_margin <= alpha:
+            return fast_score + self.lazy_margin
+        if fast_score - self.lazy_margin >= beta:
+            return fast_score - self.lazy_margin
+        
+        # Mobility evaluation (number of reachable squares)
         mobility_score = self.evaluate_mobility(board)
         
         # King safety evaluation
@@ -307,23 +936,31 @@ class ChessBot:
         total_score = (
             material_score +
             positional_score +
-            0.1 * mobility_score +
-            0.2 * king_safety_score +
-            0.1 * pawn_structure_score
+            self.eval_weights['mobility'] * mobility_score +
+            self.eval_weights['king_safety'] * king_safety_score +
+            self.eval_weights['pawn_structure'] * pawn_structure_score
         )
         
         # Perspective adjustment - positive is good for the current player
-        return total_score if board.turn == chess.WHITE else -total_score
+        if board.turn == chess.BLACK:
+            total_score = -total_score
+        if board_hash is not None:
+            if len(self.eval_cache) >= EVAL_CACHE_SIZE:
+                self.eval_cache.clear()
+            self.eval_cache[board_hash] = total_score
+        return total_score
     
     def evaluate_material(self, board):
         """Evaluate material balance"""
+        values = self.piece_values
+        white = board.occupied_co[chess.WHITE]
+        black = board.occupied_co[chess.BLACK]
         score = 0
         
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                value = self.piece_values[piece.piece_type]
-                score += value if piece.color == chess.WHITE else -value
+        for piece_type, pieces in ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights),
+                                   (chess.BISHOP, board.bishops), (chess.ROOK, board.rooks),
+                                   (chess.QUEEN, board.queens), (chess.KING, board.kings)):
+            score += values[piece_type] * (bin(pieces & white).count("1") - bin(pieces & black).count("1"))
                 
         return score
     
@@ -332,81 +969,68 @@ class ChessBot:
         score = 0
         
         # Determine game phase for king table selection
-        is_endgame = self.is_endgame(board)
-        king_table = self.king_table_endgame if is_endgame else self.king_table_middlegame
-        
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                # Get appropriate piece-square table
-                if piece.piece_type == chess.KING:
-                    table = king_table
-                else:
-                    table = self.piece_tables[piece.piece_type]
-                
-                # Get position value
-                if piece.color == chess.WHITE:
-                    position_value = table[63 - square]
-                else:
-                    position_value = table[square]
-                
-                score += position_value if piece.color == chess.WHITE else -position_value
+        king_offset = 64 * (KING_ENDGAME if self.is_endgame(board) else chess.KING)
+        
+        # The flat tables are already mirrored for each colour
+        for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+            table = self.square_tables[color]
+            own_pieces = board.occupied_co[color]
+            for offset, pieces in ((64 * chess.PAWN, board.pawns), (64 * chess.KNIGHT, board.knights),
+                                   (64 * chess.BISHOP, board.bishops), (64 * chess.ROOK, board.rooks),
+                                   (64 * chess.QUEEN, board.queens), (king_offset, board.kings)):
+                for square in chess.scan_reversed(pieces & own_pieces):
+                    score += sign * table[offset + square]
                 
         return score
     
     def evaluate_mobility(self, board):
-        """Evaluate mobility (number of legal moves)"""
-        # Save the current turn
-        original_turn = board.turn
-        
-        # Count white's moves
-        board.turn = chess.WHITE
-        white_moves = len(list(board.legal_moves))
-        
-        # Count black's moves
-        board.turn = chess.BLACK
-        black_moves = len(list(board.legal_moves))
-        
-        # Restore original turn
-        board.turn = original_turn
+        """Evaluate mobility (number of pseudo-legal moves)"""
+        # Counted from attack masks so leaves need no extra legal move generation
+        score = 0
+        for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+            own_pieces = board.occupied_co[color]
+            moves = 0
+            
+            # Piece moves to empty or enemy squares
+            for square in chess.scan_reversed(own_pieces & ~board.pawns):
+                moves += bin(board.attacks_mask(square) & ~own_pieces).count("1")
+            
+            # Single pawn pushes
+            pawns = board.pawns & own_pieces
+            pushes = (pawns << 8) if color == chess.WHITE else (pawns >> 8)
+            moves += bin(pushes & ~board.occupied & chess.BB_ALL).count("1")
+            
+            score += sign * moves
         
-        return white_moves - black_moves
+        return clamp_term('mobility', score)
     
     def evaluate_king_safety(self, board):
-        """Evaluate king safety"""
+        """
+        Evaluate king safety
+        Each king gets a bonus per own pawn in its shield and a penalty per square
+        of its zone attacked by an enemy piece, weighted by the attacker's type.
+        """
         score = 0
-        
-        # Find king positions
-        white_king_square = board.king(chess.WHITE)
-        black_king_square = board.king(chess.BLACK)
-        
-        # Evaluate pawn shield for white king
-        if white_king_square:
-            white_king_file = chess.square_file(white_king_square)
-            white_king_rank = chess.square_rank(white_king_square)
+        for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+            king_square = board.king(color)
+            if king_square is None:
+                continue
             
-            # Check pawns in front of the king (for white)
-            if white_king_rank < 7:  # Not on the last rank
-                for file_offset in [-1, 0, 1]:
-                    if 0 <= white_king_file + file_offset <= 7:
-                        pawn_square = chess.square(white_king_file + file_offset, white_king_rank + 1)
-                        if board.piece_at(pawn_square) == chess.Piece(chess.PAWN, chess.WHITE):
-                            score += 10  # Bonus for each pawn shielding the king
-        
-        # Evaluate pawn shield for black king
-        if black_king_square:
-            black_king_file = chess.square_file(black_king_square)
-            black_king_rank = chess.square_rank(black_king_square)
+            # Pawn shield
+            shield = PAWN_SHIELDS[color][king_square] & board.pawns & board.occupied_co[color]
+            score += sign * SHIELD_PAWN_BONUS * bin(shield).count("1")
             
-            # Check pawns in front of the king (for black)
-            if black_king_rank > 0:  # Not on the first rank
-                for file_offset in [-1, 0, 1]:
-                    if 0 <= black_king_file + file_offset <= 7:
-                        pawn_square = chess.square(black_king_file + file_offset, black_king_rank - 1)
-                        if board.piece_at(pawn_square) == chess.Piece(chess.PAWN, chess.BLACK):
-                            score -= 10  # Bonus for each pawn shielding the king
+            # Enemy pieces attacking the king zone
+            zone = KING_ZONES[king_square]
+            for piece_type in KING_ATTACKERS:
+                weight = KING_ATTACK_WEIGHTS[piece_type]
+                candidates = board.pieces_mask(piece_type, not color) & KING_ZONE_REACH[piece_type][king_square]
+                for square in chess.scan_reversed(candidates):
+                    attacked = board.attacks_mask(square) & zone
+                    if attacked:
+                        score -= sign * weight * bin(attacked).count("1")
         
-        return score
+        return clamp_term('king_safety', score)
     
     def evaluate_pawn_structure(self, board):
         """Evaluate pawn structure"""
@@ -470,21 +1094,19 @@ class ChessBot:
             if has_black_pawn_on_file and not has_black_pawn_on_adjacent_file:
                 score += 20
         
-        return score
+        return clamp_term('pawn_structure', score)
+    
+    def is_insufficient_material(self, board):
+        """Cheap draw test: bare kings, or a single minor piece left on the board"""
+        if board.pawns or board.rooks or board.queens:
+            return False
+        return bin(board.occupied).count("1") <= 3
     
     def is_endgame(self, board):
         """Determine if the position is an endgame"""
         # Simple endgame detection: no queens or at most one minor piece per side
-        white_queens = len(board.pieces(chess.QUEEN, chess.WHITE))
-        black_queens = len(board.pieces(chess.QUEEN, chess.BLACK))
-        
-        white_minors = (
-            len(board.pieces(chess.KNIGHT, chess.WHITE)) +
-            len(board.pieces(chess.BISHOP, chess.WHITE))
-        )
-        black_minors = (
-            len(board.pieces(chess.KNIGHT, chess.BLACK)) +
-            len(board.pieces(chess.BISHOP, chess.BLACK))
-        )
+        minors = board.knights | board.bishops
+        white_minors = bin(minors & board.occupied_co[chess.WHITE]).count("1")
+        black_minors = bin(minors & board.occupied_co[chess.BLACK]).count("1")
         
-        return (white_queens + black_queens == 0) or (white_minors <= 1 and black_minors <= 1)
\ No newline at end of file
+        return not board.queens or (white_minors <= 1 and black_minors <= 1)
\ No newline at end of file
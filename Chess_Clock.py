@@ -0,0 +1,138 @@
+"""
+Game clocks and per-move time allocation
+GameClock keeps both players' remaining time under a sudden-death or increment
+control. TimeManager turns the bot's remaining time into a budget for one move:
+a target share of the time left for the moves still expected, stretched when
+the best move keeps changing between iterations and shortened when it is stable,
+and a hard limit the search never passes.
+"""
+import time
+
+import chess
+
+# Moves a game is expected to last, and the fewest still expected at any point
+EXPECTED_GAME_MOVES = 40
+MIN_MOVES_TO_GO = 20
+
+# Share of the increment spent on top of the time left's share, and the most of
+# the time left a single move may take
+INCREMENT_SHARE = 0.75
+MAX_TIME_SHARE = 0.25
+
+# The hard limit is at most this many times the target
+MAX_TARGET_FACTOR = 4
+
+# Seconds kept back per move for the front-end and move overhead
+MOVE_OVERHEAD = 0.05
+
+# Target scale by the number of iterations the best move has been unchanged;
+# the first iteration's move starts at the neutral count
+STABILITY_SCALE = (1.6, 1.2, 1.0, 0.8, 0.6)
+NEUTRAL_STABILITY = 2
+
+# A new iteration is not started past this share of the scaled target, nor when
+# the last one times this factor would overrun the hard limit
+ITERATION_START_SHARE = 0.5
+BRANCHING_ESTIMATE = 6
+
+def parse_time_control(text):
+    """'5+3' -> (300.0, 3.0) seconds; a bare '5' is sudden death"""
+    minutes, _, increment = text.partition('+')
+    return float(minutes) * 60, float(increment or 0)
+
+def format_clock(seconds):
+    """Clock display: m:ss, with tenths under twenty seconds"""
+    if seconds < 20:
+        return f"0:{seconds:04.1f}"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+class GameClock:
+    """Chess clock for both players; the running side's time counts down while it is to move"""
+    def __init__(self, initial=300.0, increment=0.0):
+        """
+        :param initial: seconds per player at the start
+        :param increment: seconds added after each move (0 for sudden death)
+        """
+        self.initial = initial
+        self.increment = increment
+        self.reset()
+
+    def reset(self):
+        # Indexed by color: [black, white]
+        self.banked = [self.initial, self.initial]
+        self.running = None
+        self.started_at = 0.0
+
+    def start(self, color):
+        """Start color's clock"""
+        self.running = color
+        self.started_at = time.monotonic()
+
+    def stop(self):
+        """Stop the running clock, keeping the time it has left"""
+        if self.running is not None:
+            self.banked[self.running] = self.remaining(self.running)
+            self.running = None
+
+    def press(self, color=None):
+        """
+        A side has moved: add its increment and start the other clock
+        :param color: the side that moved, if its clock was already stopped (default: the running side)
+        """
+        if color is None:
+            color = self.running
+        if color is None:
+            return
+        self.stop()
+        self.banked[color] += self.increment
+        self.start(not color)
+
+    def remaining(self, color):
+        """Seconds color has left"""
+        left = self.banked[color]
+        if color == self.running:
+            left -= time.monotonic() - self.started_at
+        return max(0.0, left)
+
+    def flagged(self, color):
+        """Has color run out of time"""
+        return self.remaining(color) <= 0
+
+    def display(self):
+        """Both clocks as a status line"""
+        return f"White {format_clock(self.remaining(chess.WHITE))}   Black {format_clock(self.remaining(chess.BLACK))}"
+
+class TimeManager:
+    """Time allocation for one search under a game clock"""
+    def __init__(self, time_left, increment=0.0, moves_played=0):
+        """
+        :param time_left: seconds on the bot's clock
+        :param increment: seconds added after the move
+        :param moves_played: moves the bot's side has already made
+        """
+        moves_to_go = max(MIN_MOVES_TO_GO, EXPECTED_GAME_MOVES - moves_played)
+        usable = max(0.0, time_left - MOVE_OVERHEAD)
+        self.maximum = usable * MAX_TIME_SHARE
+        self.target = min(self.maximum, usable / moves_to_go + increment * INCREMENT_SHARE)
+        self.maximum = min(self.maximum, self.target * MAX_TARGET_FACTOR)
+        self.best_move = None
+        self.stable_iterations = NEUTRAL_STABILITY
+        self.iteration_time = 0.0
+
+    def update(self, best_move, iteration_time):
+        """Record the best move and duration of a completed iteration"""
+        self.iteration_time = iteration_time
+        if self.best_move is not None:
+            self.stable_iterations = self.stable_iterations + 1 if best_move == self.best_move else 0
+        self.best_move = best_move
+
+    def scaled_target(self):
+        """Target stretched or shortened by the best move's stability"""
+        scale = STABILITY_SCALE[min(self.stable_iterations, len(STABILITY_SCALE) - 1)]
+        return min(self.maximum, self.target * scale)
+
+    def should_stop(self, elapsed):
+        """Whether to stop before starting another iteration"""
+        return (elapsed >= self.scaled_target() * ITERATION_START_SHARE or
+                elapsed + self.iteration_time * BRANCHING_ESTIMATE > self.maximum)
\ No newline at end of file
@@ -1,15 +1,24 @@
 import pygame as pg
 import chess
-import chess.svg
-import cairosvg
 import io
 from Chess_Bot import ChessBot
+from Chess_Clock import GameClock, parse_time_control
 import sys
 import time
-from PIL import Image
+
+def svg_to_surface(svg_data):
+    """Render SVG to a pygame surface; cairosvg and PIL are imported on first use"""
+    import cairosvg
+    from PIL import Image
+    png_data = cairosvg.svg2png(bytestring=svg_data.encode('utf-8'))
+    image = Image.open(io.BytesIO(png_data))
+    return pg.image.fromstring(image.tobytes(), image.size, image.mode)
 
 class ChessGame:
-    def __init__(self, width=600, height=600):
+    def __init__(self, width=600, height=600, time_control='5+3'):
+        """
+        :param time_control: minutes per player + seconds increment per move, e.g. '5+3'
+        """
         pg.init()
         self.width = width
         self.height = height
@@ -28,8 +37,9 @@ class ChessGame:
         self.game_over = False
         self.result_message = ""
         
-        # Initialize the board image
-        self.update_board_image()
+        # Game clock, started with White to move
+        self.clock = GameClock(*parse_time_control(time_control))
+        self.clock.start(chess.WHITE)
         
         # Font for rendering text
         self.font = pg.font.SysFont('Arial', 20)
@@ -52,8 +62,13 @@ class ChessGame:
         self.status_message = "Your turn (White)"
         self.thinking = False
         
+        # Initialize the board image, once the orientation is known
+        self.update_board_image()
+        
     def update_board_image(self):
         """Update the board image based on current state"""
+        import chess.svg
+        
         # Generate SVG of the board
         orientation = chess.WHITE if self.white_at_bottom else chess.BLACK
         last_move = self.board.peek() if self.board.move_stack else None
@@ -69,16 +84,7 @@ class ChessGame:
             squares=self.selected_square
         )
         
-        # Convert SVG to PNG
-        png_data = cairosvg.svg2png(bytestring=svg_data.encode('utf-8'))
-        
-        # Convert PNG to pygame surface
-        image = Image.open(io.BytesIO(png_data))
-        mode = image.mode
-        size = image.size
-        data = image.tobytes()
-        
-        self.board_image = pg.image.fromstring(data, size, mode)
+        self.board_image = svg_to_surface(svg_data)
         
     def handle_click(self, pos):
         """Handle mouse click at position pos"""
@@ -104,6 +110,8 @@ class ChessGame:
             self.board = chess.Board()
             self.game_over = False
             self.result_message = ""
+            self.clock.reset()
+            self.clock.start(chess.WHITE)
             self.selected_square = None
             self.status_message = "New game started. Your turn (White)"
             self.update_board_image()
@@ -146,6 +154,7 @@ class ChessGame:
             # Check if the move is legal
             if move in self.board.legal_moves:
                 self.board.push(move)
+                self.clock.press()
                 self.selected_square = None
                 self.update_board_image()
                 self.check_game_over()
@@ -177,15 +186,26 @@ class ChessGame:
         """Let the bot make a move"""
         # Add a small delay to show "thinking" status
         start_time = time.time()
-        bot_move = self.bot.get_best_move(self.board)
+        bot_color = self.board.turn
+        bot_move = self.bot.get_best_move(self.board, self.clock.remaining(bot_color), self.clock.increment)
         elapsed_time = time.time() - start_time
         
+        # The bot's clock stops with the search, not after the display delay
+        self.clock.stop()
+        if self.clock.flagged(bot_color):
+            self.game_over = True
+            self.result_message = "Bot ran out of time! You win!"
+            self.status_message = self.result_message
+            self.thinking = False
+            return
+        
         # Ensure minimum thinking time for UI feedback
         if elapsed_time < 0.5:
             time.sleep(0.5 - elapsed_time)
         
         # Make the move
         self.board.push(bot_move)
+        self.clock.press(bot_color)
         self.update_board_image()
         self.check_game_over()
         
@@ -217,6 +237,8 @@ class ChessGame:
             self.game_over = True
             self.result_message = "Draw by repetition!"
             self.status_message = self.result_message
+        if self.game_over:
+            self.clock.stop()
     
     def draw(self):
         """Draw the game state"""
@@ -255,8 +277,16 @@ class ChessGame:
         status_text = self.font.render(self.status_message, True, (0, 0, 0))
         self.screen.blit(status_text, (10, 10))
         
-    def run(self):
-        """Run the game loop"""
+        # Draw clocks at the top right
+        clock_text = self.font.render(self.clock.display(), True, (0, 0, 0))
+        self.screen.blit(clock_text, (self.width - clock_text.get_width() - 10, 10))
+        
+    def run(self, start_time=None):
+        """
+        Run the game loop
+        :param start_time: time.perf_counter() at launch, for the time-to-first-frame report
+        """
+        first_frame = True
         running = True
         while running:
             for event in pg.event.get():
@@ -265,7 +295,17 @@ class ChessGame:
                 elif event.type == pg.MOUSEBUTTONDOWN:
                     self.handle_click(pg.mouse.get_pos())
             
+            # Player out of time
+            if not self.game_over and self.clock.flagged(self.player_color):
+                self.game_over = True
+                self.result_message = "Out of time! Bot wins!"
+                self.status_message = self.result_message
+                self.clock.stop()
+            
             self.draw()
             pg.display.flip()
+            if first_frame and start_time is not None:
+                print(f"First frame after {(time.perf_counter() - start_time) * 1000:.0f} ms")
+            first_frame = False
             
         pg.quit()
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Load generator for the engine server
+Plays many games at once against a running Chess_Server.py, one connection per
+game, with the engine playing both sides. Reports request throughput, latency
+percentiles and how often the server refused work (busy) or missed a deadline.
+Usage:
+    python Chess_LoadGen.py [--host 127.0.0.1 --port 8765 | --unix PATH] [--games 16] [--plies 10]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from Chess_Benchmark import BENCHMARK_POSITIONS, percentile
+
+# Back-off before retrying a request the server refused as busy
+BUSY_BACKOFF = 0.05
+
+class EngineClient:
+    """One connection to the engine server"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, request_type, **fields):
+        """Send one request and wait for its response"""
+        self.next_id += 1
+        message = {'id': self.next_id, 'type': request_type, **fields}
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if response.get('id') != self.next_id:
+            raise RuntimeError(f"Response {response.get('id')} to request {self.next_id}")
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def play_game(args, fen, latencies, errors):
+    """Self-play one game through the server, timing every best_move request"""
+    client = await EngineClient.connect(args.host, args.port, args.unix)
+    try:
+        response = await client.request('new_session', difficulty=args.difficulty,
+                                        backend=args.backend, fen=fen)
+        session = response['session']
+        plies = 0
+        while plies < args.plies:
+            start_time = time.perf_counter()
+            response = await client.request('best_move', session=session, play=True, deadline=args.deadline)
+            if response['ok']:
+                latencies.append(time.perf_counter() - start_time)
+                plies += 1
+                continue
+            errors[response['error']] = errors.get(response['error'], 0) + 1
+            if response['error'] == 'busy':
+                await asyncio.sleep(BUSY_BACKOFF * (1 + random.random()))
+            elif response['error'] == 'deadline exceeded':
+                # A missed deadline uses up a ply, so a deadline that can never be met still ends the game
+                plies += 1
+            else:
+                break  # game over or a broken session
+        await client.request('close_session', session=session)
+    finally:
+        await client.close()
+
+async def run(args):
+    latencies = []
+    errors = {}
+    start_time = time.perf_counter()
+    await asyncio.gather(*(play_game(args, BENCHMARK_POSITIONS[i % len(BENCHMARK_POSITIONS)], latencies, errors)
+                           for i in range(args.games)))
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{len(latencies)} moves from {args.games} games in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.2f} moves/s)")
+    if latencies:
+        print(f"latency p50 {percentile(latencies, 0.5):.3f} s, p90 {percentile(latencies, 0.9):.3f} s, "
+              f"p99 {percentile(latencies, 0.99):.3f} s, max {max(latencies):.3f} s")
+    for error, count in sorted(errors.items()):
+        print(f"{error}: {count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the chess engine server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="connect to this Unix socket path instead of TCP")
+    parser.add_argument('--games', type=int, default=16, help="games played at once")
+    parser.add_argument('--plies', type=int, default=10, help="engine moves per game")
+    parser.add_argument('--difficulty', default='easy')
+    parser.add_argument('--backend', default='bitboard')
+    parser.add_argument('--deadline', type=float, default=5.0, help="seconds allowed per move request")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
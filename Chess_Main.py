@@ -2,6 +2,12 @@
 Chess Bot with Minimax, Alpha-Beta Pruning, and Dynamic Programming
 Main script to run the chess game
 """
+import time
+
+# Launch time for the time-to-first-frame report, taken before any heavy import
+START_TIME = time.perf_counter()
+
+import importlib.util
 import os
 import sys
 
@@ -9,12 +15,10 @@ import sys
 chess_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(chess_dir)
 
-# Import essential modules first
-try:
-    import pygame
-    import chess
-except ImportError as e:
-    print(f"Missing core package: {e}")
+# Check the essential modules are installed; they are imported by the interface itself
+missing = [name for name in ('pygame', 'chess') if importlib.util.find_spec(name) is None]
+if missing:
+    print(f"Missing core package: {', '.join(missing)}")
     print("Please install the required packages using:")
     print("pip install pygame python-chess")
     sys.exit(1)
@@ -26,21 +30,21 @@ except ImportError as e:
 INTERFACE_TYPE = 1  # Using simple Pygame interface by default
 
 # Only import Cairo-related modules if actually using that interface
-if INTERFACE_TYPE == 1:
-    print("Starting simple Pygame interface...")
-    import Chess_pygame
-    Chess_pygame.main()
-else:
+if INTERFACE_TYPE == 2 and all(importlib.util.find_spec(name) for name in ('cairosvg', 'PIL')):
     print("Starting Cairo-based SVG interface...")
-    # Only try to import Cairo dependencies when needed
     try:
-        import cairosvg
-        from PIL import Image
         from Chess_GUI import ChessGame
         game = ChessGame()
-        game.run()
-    except ImportError as e:
-        print(f"Error importing Cairo dependencies: {e}")
+        game.run(START_TIME)
+        sys.exit()
+    except (ImportError, OSError) as e:
+        # cairosvg imports fine without the Cairo library and fails on first use
+        print(f"Error loading Cairo dependencies: {e}")
         print("Falling back to simple Pygame interface...")
-        import Chess_pygame
-        Chess_pygame.main()
\ No newline at end of file
+elif INTERFACE_TYPE == 2:
+    print("Cairo dependencies not installed (pip install cairosvg pillow)")
+    print("Falling back to simple Pygame interface...")
+
+print("Starting simple Pygame interface...")
+import Chess_pygame
+Chess_pygame.main(START_TIME)
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Mate-in-N solver for puzzle positions
+A boolean AND/OR search: the attacker needs one move that mates against every
+defence, so no evaluation is computed and a line is dropped at the first
+refutation. The attacker's moves are tried checks first, and with a single move
+left only checks are generated, since nothing else can mate.
+Usage:
+    python Chess_MateSolver.py FEN [--moves 3] [--backend bitboard] [--checks-only]
+"""
+import argparse
+import time
+
+import chess
+
+from Chess_Bot import SEARCH_BACKENDS, SearchTimeout, decode_move
+
+class MateSolver:
+    """Finds the shortest forced mate of at most N moves for the side to move"""
+    def __init__(self, backend='bitboard', checks_only=False, node_budget=None):
+        """
+        :param backend: search board backend, as for ChessBot
+        :param checks_only: only consider checking moves for the attacker (faster, but misses quiet keys)
+        :param node_budget: give up with SearchTimeout after this many nodes
+        """
+        if backend not in SEARCH_BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {list(SEARCH_BACKENDS)}")
+        self.board_class = SEARCH_BACKENDS[backend]
+        self.checks_only = checks_only
+        self.node_budget = node_budget
+        self.nodes = 0
+        # (key, moves) -> mating move code for attacker nodes, True/False for defender nodes
+        self.attack_results = {}
+        self.defence_results = {}
+
+    def solve(self, board, max_moves):
+        """
+        Return the main line of the shortest mate in at most max_moves, or None
+        The line follows the defence that delays mate the longest.
+        """
+        self.nodes = 0
+        self.attack_results.clear()
+        self.defence_results.clear()
+        search_board = self.board_class.from_board(board)
+        for moves in range(1, max_moves + 1):
+            if self.attack(search_board, moves):
+                return [decode_move(code) for code in self.main_line(search_board, moves)]
+        return None
+
+    def attack(self, board, moves):
+        """Mating move for the side to move within moves, or 0"""
+        key = (board.transposition_key(), moves)
+        if key in self.attack_results:
+            return self.attack_results[key]
+        self.count_node()
+
+        # Checks first; with one move left, only a check can mate
+        checks = []
+        others = []
+        for code in board.legal_codes():
+            if board.gives_check_code(code):
+                checks.append(code)
+            elif moves > 1 and not self.checks_only:
+                # Captures ahead of quiet moves
+                if board.piece_type_at((code >> 6) & 63):
+                    others.insert(0, code)
+                else:
+                    others.append(code)
+
+        result = 0
+        for code in checks + others:
+            board.push_code(code)
+            mated = self.defend(board, moves)
+            board.pop_code()
+            if mated:
+                result = code
+                break
+        self.attack_results[key] = result
+        return result
+
+    def defend(self, board, moves):
+        """Is the side to move mated within moves - 1 further attacker moves"""
+        key = (board.transposition_key(), moves)
+        if key in self.defence_results:
+            return self.defence_results[key]
+        self.count_node()
+
+        codes = board.legal_codes()
+        if not codes:
+            result = board.is_check()
+        elif moves == 1:
+            result = False
+        else:
+            result = True
+            for code in codes:
+                board.push_code(code)
+                mating = self.attack(board, moves - 1)
+                board.pop_code()
+                if not mating:
+                    result = False
+                    break
+        self.defence_results[key] = result
+        return result
+
+    def main_line(self, board, moves):
+        """Attacker's mating moves and the longest-resisting replies"""
+        line = []
+        while True:
+            code = self.attack(board, moves)
+            board.push_code(code)
+            line.append(code)
+            # Pick the reply that needs the most attacker moves to mate
+            longest_reply = None
+            for reply in board.legal_codes():
+                board.push_code(reply)
+                needed = next(n for n in range(1, moves) if self.attack(board, n))
+                board.pop_code()
+                if longest_reply is None or needed > longest_reply[1]:
+                    longest_reply = (reply, needed)
+            if longest_reply is None:
+                break
+            board.push_code(longest_reply[0])
+            line.append(longest_reply[0])
+            moves = longest_reply[1]
+        for _ in line:
+            board.pop_code()
+        return line
+
+    def count_node(self):
+        self.nodes += 1
+        if self.node_budget is not None and self.nodes > self.node_budget:
+            raise SearchTimeout()
+
+def find_mate(board, max_moves, backend='bitboard', checks_only=False):
+    """Main line of the shortest forced mate in at most max_moves, or None"""
+    return MateSolver(backend, checks_only).solve(board, max_moves)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find a forced mate in a puzzle position")
+    parser.add_argument('fen')
+    parser.add_argument('--moves', type=int, default=3, help="longest mate to look for, in moves")
+    parser.add_argument('--backend', default='bitboard')
+    parser.add_argument('--checks-only', action='store_true', help="only try checking moves for the attacker")
+    args = parser.parse_args()
+
+    board = chess.Board(args.fen)
+    solver = MateSolver(args.backend, args.checks_only)
+    start_time = time.time()
+    line = solver.solve(board, args.moves)
+    elapsed = time.time() - start_time
+    if line is None:
+        print(f"No mate in {args.moves} found")
+    else:
+        print(f"Mate in {(len(line) + 1) // 2}: {board.variation_san(line)}")
+    print(f"{solver.nodes} nodes in {elapsed:.2f} seconds")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
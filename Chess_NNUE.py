@@ -0,0 +1,188 @@
+"""
+NNUE-style evaluator in NumPy
+768 piece-square input features (our/their piece type on a square, seen from
+each side) feed an accumulator per perspective. The accumulators are updated
+incrementally as the search makes and unmakes moves, so a leaf only pays for
+the small dense head: clipped ReLU, one hidden layer and a linear output.
+Weights are stored in a .npz file with the arrays named in WEIGHT_ARRAYS.
+Requires numpy (pip install numpy).
+Usage:
+    python Chess_NNUE.py init nnue.npz
+"""
+import argparse
+import sys
+
+import chess
+import numpy as np
+
+from Chess_Bot import ChessBot, Evaluator, MAX_PLY
+
+FEATURE_COUNT = 768
+ACCUMULATOR_SIZE = 64
+HIDDEN_SIZE = 32
+WEIGHT_ARRAYS = ('feature_weights', 'feature_bias', 'hidden_weights', 'hidden_bias',
+                 'output_weights', 'output_bias')
+
+# Material and table values are divided by this in from_classical, keeping one
+# side's total inside the clipped ReLU's [0, 1] range
+CLASSICAL_SCALE = 10000.0
+
+def _feature_table():
+    """FEATURE_INDEX[perspective][color][piece_type][square], squares flipped for black"""
+    return [[[[((color != perspective) * 6 + piece_type - 1) * 64 +
+               (square if perspective == chess.WHITE else square ^ 56)
+               for square in chess.SQUARES]
+              for piece_type in range(7)]
+             for color in (chess.BLACK, chess.WHITE)]
+            for perspective in (chess.BLACK, chess.WHITE)]
+
+FEATURE_INDEX = _feature_table()
+
+class NNUEEvaluator(Evaluator):
+    """Evaluator running a small NNUE-style network on an incrementally updated accumulator"""
+    def __init__(self, path=None, weights=None):
+        """
+        :param path: .npz weight file
+        :param weights: dict of weight arrays, instead of a file
+        """
+        if path is not None:
+            with np.load(path) as data:
+                weights = {name: data[name] for name in WEIGHT_ARRAYS}
+        self.feature_weights = np.asarray(weights['feature_weights'], dtype=np.float32)
+        self.feature_bias = np.asarray(weights['feature_bias'], dtype=np.float32)
+        # The hidden layer is split into the halves for our and their accumulator
+        hidden_weights = np.asarray(weights['hidden_weights'], dtype=np.float32)
+        size = self.feature_weights.shape[1]
+        self.hidden_us = np.ascontiguousarray(hidden_weights[:size])
+        self.hidden_them = np.ascontiguousarray(hidden_weights[size:])
+        self.hidden_bias = np.asarray(weights['hidden_bias'], dtype=np.float32)
+        self.output_weights = np.asarray(weights['output_weights'], dtype=np.float32)
+        self.output_bias = float(weights['output_bias'])
+
+        # Accumulator stack, one entry per ply made since attach(), indexed [ply][perspective]
+        self.accumulators = np.zeros((2 * MAX_PLY + 1, 2, size), dtype=np.float32)
+        self.ply = 0
+
+    @classmethod
+    def from_classical(cls, bot=None, accumulator_size=ACCUMULATOR_SIZE, hidden_size=HIDDEN_SIZE):
+        """
+        Network reproducing the classical material and piece-square evaluation
+        One accumulator neuron sums our material and table values, another sums
+        theirs, and the head outputs the difference. It is a working starting
+        point for training. Kings always use the middlegame table, and tables are
+        assumed left-right symmetric.
+        """
+        bot = bot or ChessBot()
+        feature_weights = np.zeros((FEATURE_COUNT, accumulator_size), dtype=np.float32)
+        for piece_type in chess.PIECE_TYPES:
+            value = bot.piece_values[piece_type] if piece_type != chess.KING else 0
+            offset = 64 * piece_type
+            for square in chess.SQUARES:
+                # Rows are set from white's view
+                ours = FEATURE_INDEX[chess.WHITE][chess.WHITE][piece_type][square]
+                theirs = FEATURE_INDEX[chess.WHITE][chess.BLACK][piece_type][square]
+                feature_weights[ours, 0] = (value + bot.square_tables[chess.WHITE][offset + square]) / CLASSICAL_SCALE
+                feature_weights[theirs, 1] = (value + bot.square_tables[chess.BLACK][offset + square]) / CLASSICAL_SCALE
+        hidden_weights = np.zeros((2 * accumulator_size, hidden_size), dtype=np.float32)
+        hidden_weights[0, 0] = hidden_weights[1, 1] = 1.0
+        hidden_weights[1, 0] = hidden_weights[0, 1] = -1.0
+        output_weights = np.zeros(hidden_size, dtype=np.float32)
+        output_weights[0] = CLASSICAL_SCALE
+        output_weights[1] = -CLASSICAL_SCALE
+        return cls(weights={
+            'feature_weights': feature_weights,
+            'feature_bias': np.zeros(accumulator_size, dtype=np.float32),
+            'hidden_weights': hidden_weights,
+            'hidden_bias': np.zeros(hidden_size, dtype=np.float32),
+            'output_weights': output_weights,
+            'output_bias': 0.0,
+        })
+
+    def save(self, path):
+        np.savez(path, feature_weights=self.feature_weights, feature_bias=self.feature_bias,
+                 hidden_weights=np.concatenate((self.hidden_us, self.hidden_them)),
+                 hidden_bias=self.hidden_bias, output_weights=self.output_weights,
+                 output_bias=np.float32(self.output_bias))
+
+    def attach(self, board):
+        """Refresh the accumulator from the board and hook its make/unmake"""
+        self.ply = 0
+        for perspective in (chess.BLACK, chess.WHITE):
+            indices = [FEATURE_INDEX[perspective][color][piece_type][square]
+                       for color in chess.COLORS
+                       for piece_type in chess.PIECE_TYPES
+                       for square in chess.scan_reversed(board.pieces_mask(piece_type, color))]
+            self.accumulators[0, int(perspective)] = self.feature_bias + self.feature_weights[indices].sum(axis=0)
+
+        push_code = board.push_code
+        pop_code = board.pop_code
+
+        def push_hook(code):
+            self.push(board, code)
+            push_code(code)
+
+        def pop_hook():
+            pop_code()
+            self.ply -= 1
+
+        board.push_code = push_hook
+        board.pop_code = pop_hook
+
+    def push(self, board, code):
+        """Accumulator after a packed move, computed before the move is made"""
+        from_square = code & 63
+        to_square = (code >> 6) & 63
+        promotion = code >> 12
+        color = board.turn
+        piece_type = board.piece_type_at(from_square)
+        captured = board.piece_type_at(to_square)
+        captured_square = to_square
+
+        removed = [(color, piece_type, from_square)]
+        added = [(color, promotion or piece_type, to_square)]
+        if captured:
+            removed.append((not color, captured, captured_square))
+        elif piece_type == chess.PAWN and to_square == board.ep_square:
+            removed.append((not color, chess.PAWN, to_square ^ 8))
+        elif piece_type == chess.KING and to_square - from_square in (2, -2):
+            # Castling also moves the rook
+            if to_square > from_square:
+                removed.append((color, chess.ROOK, from_square + 3))
+                added.append((color, chess.ROOK, from_square + 1))
+            else:
+                removed.append((color, chess.ROOK, from_square - 4))
+                added.append((color, chess.ROOK, from_square - 1))
+
+        weights = self.feature_weights
+        accumulators = self.accumulators
+        # NumPy reads a bool index as a mask, so perspectives index as 0 (black) and 1 (white)
+        for perspective in (0, 1):
+            index = FEATURE_INDEX[perspective]
+            delta = weights[[index[c][p][s] for c, p, s in added]].sum(axis=0)
+            delta -= weights[[index[c][p][s] for c, p, s in removed]].sum(axis=0)
+            np.add(accumulators[self.ply, perspective], delta, out=accumulators[self.ply + 1, perspective])
+        self.ply += 1
+
+    def evaluate(self, board, alpha=float('-inf'), beta=float('inf')):
+        """Score for the side to move; the network is cheap enough to ignore the window"""
+        accumulator = self.accumulators[self.ply]
+        us = np.clip(accumulator[int(board.turn)], 0.0, 1.0)
+        them = np.clip(accumulator[int(not board.turn)], 0.0, 1.0)
+        hidden = us @ self.hidden_us + them @ self.hidden_them + self.hidden_bias
+        np.maximum(hidden, 0.0, out=hidden)
+        return float(hidden @ self.output_weights) + self.output_bias
+
+def main():
+    parser = argparse.ArgumentParser(description="NNUE-style evaluator weights")
+    commands = parser.add_subparsers(dest='command', required=True)
+    init = commands.add_parser('init', help="write weights that reproduce the classical material and tables")
+    init.add_argument('path')
+    init.add_argument('--params', help="classical parameter file to start from (see Chess_Tuner.py)")
+    args = parser.parse_args()
+
+    NNUEEvaluator.from_classical(ChessBot(params_file=args.params)).save(args.path)
+    print(f"Weights written to {args.path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
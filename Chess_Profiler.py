@@ -0,0 +1,144 @@
+"""
+Profiling mode for the chess bot
+ProfilingChessBot records cumulative time and call counts for every evaluation
+term, move ordering, move generation, hashing and transposition table access.
+Plain ChessBot is untouched, so profiling costs nothing unless this class is used.
+Usage:
+    python Chess_Profiler.py [--fen FEN] [--difficulty hard] [--out search.prof]
+"""
+import argparse
+import cProfile
+import time
+
+import chess
+
+from Chess_Bot import ChessBot
+
+# ChessBot methods timed by ProfilingChessBot (times include nested calls, so a
+# recursive method such as quiescence counts its inner calls more than once)
+PROFILED_METHODS = [
+    'evaluate_board',
+    'evaluate_material',
+    'evaluate_position',
+    'evaluate_mobility',
+    'evaluate_king_safety',
+    'evaluate_pawn_structure',
+    'order_moves',
+    'order_captures',
+    'quiescence',
+    'get_board_hash',
+]
+
+def timed(stats, name, func):
+    """Wrap func so every call adds to stats[name] = [calls, seconds]"""
+    entry = stats.setdefault(name, [0, 0.0])
+    perf_counter = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry[0] += 1
+            entry[1] += perf_counter() - start
+    return wrapper
+
+class ProfiledTable:
+    """Transposition table proxy that times get and put"""
+    def __init__(self, table, stats):
+        self.table = table
+        self.get = timed(stats, 'tt_get', table.get)
+        self.put = timed(stats, 'tt_put', table.put)
+
+    def __getattr__(self, name):
+        return getattr(self.table, name)
+
+    def __len__(self):
+        return len(self.table)
+
+class ProfilingChessBot(ChessBot):
+    """ChessBot that reports where each search spends its time"""
+    __slots__ = ('profile_stats',)
+
+    def __init__(self, *args, **kwargs):
+        self.profile_stats = {name: [0, 0.0] for name in PROFILED_METHODS}
+        super().__init__(*args, **kwargs)
+        self.transposition_table = ProfiledTable(self.transposition_table, self.profile_stats)
+
+    def get_best_move(self, board, *args, **kwargs):
+        """Search as ChessBot does, then print the per-term profile of that search"""
+        self.reset_profile()
+        move = super().get_best_move(board, *args, **kwargs)
+        print(self.profile_report())
+        return move
+
+    def make_search_board(self, board):
+        search_board = super().make_search_board(board)
+        search_board.legal_codes = timed(self.profile_stats, 'legal_codes', search_board.legal_codes)
+        return search_board
+
+    def reset_profile(self):
+        for entry in self.profile_stats.values():
+            entry[0] = 0
+            entry[1] = 0.0
+
+    def profile_report(self):
+        """Table of calls, cumulative time and time per call, slowest first"""
+        lines = [f"{'function':<26}{'calls':>10}{'total s':>10}{'per call us':>13}"]
+        for name, (calls, seconds) in sorted(self.profile_stats.items(), key=lambda item: -item[1][1]):
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            lines.append(f"{name:<26}{calls:>10}{seconds:>10.3f}{per_call:>13.1f}")
+        return "\n".join(lines)
+
+def _profiled_method(name):
+    """Timed override of a ChessBot method"""
+    base = getattr(ChessBot, name)
+
+    def method(self, *args, **kwargs):
+        entry = self.profile_stats[name]
+        start = time.perf_counter()
+        try:
+            return base(self, *args, **kwargs)
+        finally:
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+    method.__name__ = name
+    method.__doc__ = base.__doc__
+    return method
+
+for _name in PROFILED_METHODS:
+    setattr(ProfilingChessBot, _name, _profiled_method(_name))
+
+def profile_search(bot, board, path):
+    """
+    Run one search under cProfile and dump the stats to path
+    The dump is standard pstats, readable by pstats, snakeviz or flameprof.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        move = bot.get_best_move(board)
+    finally:
+        profiler.disable()
+    profiler.dump_stats(path)
+    return move
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile one chess bot search")
+    parser.add_argument('--fen', default=chess.STARTING_FEN)
+    parser.add_argument('--difficulty', default='hard')
+    parser.add_argument('--backend', default='python-chess')
+    parser.add_argument('--out', help="write a cProfile dump of the search to this file")
+    args = parser.parse_args()
+
+    bot = ProfilingChessBot(difficulty=args.difficulty, backend=args.backend)
+    board = chess.Board(args.fen)
+    if args.out:
+        move = profile_search(bot, board, args.out)
+        print(f"cProfile dump written to {args.out}")
+    else:
+        move = bot.get_best_move(board)
+    print(f"Best move: {move}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""
+Asyncio engine server for hosting many games at once
+Clients connect over TCP or a Unix socket and exchange one JSON object per
+line. Each session holds a game (starting FEN and moves played) and its bot
+settings; searches run on a bounded process pool with a deadline per request,
+and requests beyond the queue limit are refused with "busy" so clients back off.
+Requests, with an "id" echoed in the response:
+    {"type": "new_session", "difficulty": "medium", "backend": "python-chess", "fen": FEN}
+    {"type": "push", "session": ID, "move": UCI}
+    {"type": "best_move", "session": ID, "play": true, "deadline": 2.0}
+    {"type": "analyze", "session": ID, "lines": 3, "deadline": 5.0}
+    {"type": "close_session", "session": ID}
+    {"type": "status"}
+Responses are {"id": ..., "ok": true, ...} or {"id": ..., "ok": false, "error": MESSAGE}.
+Usage:
+    python Chess_Server.py [--host 127.0.0.1 --port 8765 | --unix PATH] [--workers 4] [--max-pending 16]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from Chess_Bot import ChessBot, DIFFICULTY_LEVELS, SEARCH_BACKENDS
+
+# Share of the time left before a request's deadline given to the search itself
+SEARCH_TIME_SHARE = 0.8
+
+# Bots kept by each worker process, so their transposition tables stay warm
+_worker_bots = {}
+
+def search_position(root_fen, moves, difficulty, backend, time_budget, num_lines=None):
+    """Worker process entry point: search a game position and return a JSON-ready result"""
+    bot = _worker_bots.get((difficulty, backend))
+    if bot is None:
+        bot = _worker_bots[(difficulty, backend)] = ChessBot(difficulty=difficulty, backend=backend)
+    bot.time_budget = time_budget
+    board = chess.Board(root_fen)
+    for move in moves:
+        board.push_uci(move)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if num_lines is not None:
+            lines = bot.analyze(board, num_lines)
+        else:
+            move = bot.get_best_move(board)
+    result = {'depth': bot.search_depth, 'nodes': bot.nodes_evaluated}
+    if num_lines is not None:
+        result['lines'] = [{'move': move.uci(), 'score': score, 'pv': [pv_move.uci() for pv_move in pv]}
+                           for move, score, pv in lines]
+    else:
+        result['move'] = move.uci()
+        result['score'] = bot.last_score
+    return result
+
+class RequestError(Exception):
+    """A request that cannot be served; the message goes back to the client"""
+
+class Session:
+    """One hosted game: its position and bot settings"""
+    def __init__(self, difficulty, backend, fen):
+        self.difficulty = difficulty
+        self.backend = backend
+        self.board = chess.Board(fen)
+        self.root_fen = fen
+        # Searches on one game run one at a time
+        self.lock = asyncio.Lock()
+
+    def moves(self):
+        return [move.uci() for move in self.board.move_stack]
+
+class EngineServer:
+    """Serves JSON-line requests, scheduling searches onto a process pool"""
+    def __init__(self, workers=None, max_pending=None):
+        """
+        :param workers: search processes (default: CPU count)
+        :param max_pending: searches queued or running before new ones are refused (default: 4 per worker)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.worker_slots = asyncio.Semaphore(self.workers)
+        self.pending = 0
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.stats = {'requests': 0, 'searches': 0, 'busy': 0, 'deadline_exceeded': 0}
+        self.handlers = {
+            'new_session': self.new_session,
+            'push': self.push,
+            'best_move': self.best_move,
+            'analyze': self.analyze,
+            'close_session': self.close_session,
+            'status': self.status,
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Read requests line by line; each is answered as soon as it completes"""
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self.respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def respond(self, line, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("Request must be a JSON object")
+            request_id = request.get('id')
+            handler = self.handlers.get(request.get('type'))
+            if handler is None:
+                raise RequestError(f"Unknown request type {request.get('type')!r}")
+            self.stats['requests'] += 1
+            response = {'id': request_id, 'ok': True}
+            response.update(await handler(request))
+        except (RequestError, ValueError, TypeError) as error:
+            response = {'id': request_id, 'ok': False, 'error': str(error)}
+        except KeyError as error:
+            response = {'id': request_id, 'ok': False, 'error': f"Missing field {error}"}
+        except Exception as error:
+            # Anything else (a broken worker pool, say) still gets an answer, so the client never hangs
+            print(f"Request {request_id!r} failed: {error!r}")
+            response = {'id': request_id, 'ok': False, 'error': f"Internal error: {type(error).__name__}"}
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    def session(self, request):
+        session = self.sessions.get(request.get('session'))
+        if session is None:
+            raise RequestError(f"No session {request.get('session')!r}")
+        return session
+
+    async def new_session(self, request):
+        difficulty = request.get('difficulty', 'medium')
+        backend = request.get('backend', 'python-chess')
+        if difficulty not in DIFFICULTY_LEVELS:
+            raise RequestError(f"Unknown difficulty {difficulty!r}")
+        if backend not in SEARCH_BACKENDS:
+            raise RequestError(f"Unknown backend {backend!r}")
+        session_id = next(self.session_ids)
+        self.sessions[session_id] = Session(difficulty, backend, request.get('fen', chess.STARTING_FEN))
+        return {'session': session_id}
+
+    async def push(self, request):
+        session = self.session(request)
+        async with session.lock:
+            move = chess.Move.from_uci(request['move'])
+            if move not in session.board.legal_moves:
+                raise RequestError(f"Illegal move {request['move']}")
+            session.board.push(move)
+        return {'fen': session.board.fen()}
+
+    async def best_move(self, request):
+        session = self.session(request)
+        async with session.lock:
+            result = await self.search(session, request)
+            if request.get('play'):
+                session.board.push_uci(result['move'])
+                result['fen'] = session.board.fen()
+        return result
+
+    async def analyze(self, request):
+        session = self.session(request)
+        num_lines = int(request.get('lines', 3))
+        if num_lines < 1:
+            raise RequestError("lines must be at least 1")
+        async with session.lock:
+            return await self.search(session, request, num_lines)
+
+    async def close_session(self, request):
+        self.session(request)
+        del self.sessions[request['session']]
+        return {}
+
+    async def status(self, request):
+        return {'sessions': len(self.sessions), 'pending': self.pending, 'workers': self.workers, **self.stats}
+
+    async def search(self, session, request, num_lines=None):
+        """Run a search on the pool within the request's deadline, refusing work beyond the queue limit"""
+        if session.board.is_game_over():
+            raise RequestError("Game is over")
+        level_budget = DIFFICULTY_LEVELS[session.difficulty]['time_budget']
+        deadline = time.monotonic() + float(request.get('deadline', 2 * level_budget + 1))
+        if self.pending >= self.max_pending:
+            self.stats['busy'] += 1
+            raise RequestError("busy")
+        self.pending += 1
+        try:
+            # Wait for a free worker, but not past the deadline
+            try:
+                await asyncio.wait_for(self.worker_slots.acquire(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                self.stats['deadline_exceeded'] += 1
+                raise RequestError("deadline exceeded") from None
+            slot_held = True
+            try:
+                time_budget = min(level_budget, (deadline - time.monotonic()) * SEARCH_TIME_SHARE)
+                if time_budget <= 0:
+                    self.stats['deadline_exceeded'] += 1
+                    raise RequestError("deadline exceeded")
+                self.stats['searches'] += 1
+                future = asyncio.get_running_loop().run_in_executor(
+                    self.pool, search_position, session.root_fen, session.moves(),
+                    session.difficulty, session.backend, time_budget, num_lines)
+                # The result must arrive by the deadline too (a cold pool or a long game replay can overrun)
+                done, _ = await asyncio.wait({future}, timeout=deadline - time.monotonic())
+                if not done:
+                    # The worker stays busy until the search ends, so its slot is freed only then
+                    slot_held = False
+                    future.add_done_callback(self.release_late_worker)
+                    self.stats['deadline_exceeded'] += 1
+                    raise RequestError("deadline exceeded")
+                return future.result()
+            finally:
+                if slot_held:
+                    self.worker_slots.release()
+        finally:
+            self.pending -= 1
+
+    def release_late_worker(self, future):
+        """Free the slot of a search that finished after its request gave up on it"""
+        self.worker_slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved, so a failure is not reported as unhandled
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Engine server on {addresses} with {self.workers} workers")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio chess engine server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--workers', type=int, help="search processes (default: CPU count)")
+    parser.add_argument('--max-pending', type=int, help="searches queued or running before refusing with busy")
+    args = parser.parse_args()
+
+    async def run():
+        await EngineServer(args.workers, args.max_pending).serve(args.host, args.port, args.unix)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
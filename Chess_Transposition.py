@@ -0,0 +1,112 @@
+"""
+Compact NumPy transposition table with on-disk persistence
+All entries live in one structured array that can be saved to and warm-loaded
+from a memory-mapped file, so analysis workers can reuse earlier searches.
+Requires numpy (pip install numpy).
+"""
+import os
+import struct
+
+import numpy as np
+
+# One 16-byte entry per slot; a key of 0 marks an empty slot
+TT_DTYPE = np.dtype([
+    ('key', '<u8'),
+    ('score', '<f4'),
+    ('move', '<u2'),
+    ('depth', 'i1'),
+    ('flag', 'u1'),
+])
+
+# File header: magic, format version, entry size, capacity (padded to 64 bytes)
+TT_MAGIC = b'CHESSTT\0'
+TT_VERSION = 1
+HEADER_FORMAT = '<8sIIQ'
+HEADER_SIZE = 64
+
+class NumpyTranspositionTable:
+    """
+    Fixed-size, always-replace-unless-shallower hash table indexed by Zobrist key
+    Drop-in for LRUCache: get(key) returns (depth, score, flag, move) or None
+    """
+    def __init__(self, capacity, path=None, read_only=False):
+        """
+        :param capacity: number of slots, rounded up to a power of two
+        :param path: backing file; loaded if it exists, created otherwise
+        :param read_only: map the file copy-on-write, so writes stay private to this process
+        """
+        self.path = path
+        self.read_only = read_only
+        if path and os.path.exists(path):
+            self.table = self._map(path, read_only)
+        else:
+            size = 1
+            while size < capacity:
+                size <<= 1
+            if path:
+                self._create(path, size)
+                self.table = self._map(path, read_only)
+            else:
+                self.table = np.zeros(size, dtype=TT_DTYPE)
+        self.capacity = len(self.table)
+        self.mask = self.capacity - 1
+
+    @staticmethod
+    def _create(path, capacity):
+        """Write an empty table file with a versioned header"""
+        header = struct.pack(HEADER_FORMAT, TT_MAGIC, TT_VERSION, TT_DTYPE.itemsize, capacity)
+        with open(path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.truncate(HEADER_SIZE + capacity * TT_DTYPE.itemsize)
+
+    @staticmethod
+    def _map(path, read_only):
+        """Memory-map an existing table file after validating its header"""
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{path} is not a transposition table file")
+        magic, version, entry_size, capacity = struct.unpack_from(HEADER_FORMAT, header)
+        if magic != TT_MAGIC:
+            raise ValueError(f"{path} is not a transposition table file")
+        if version != TT_VERSION or entry_size != TT_DTYPE.itemsize:
+            raise ValueError(f"{path} has table format version {version}, expected {TT_VERSION}")
+        return np.memmap(path, dtype=TT_DTYPE, mode='c' if read_only else 'r+',
+                         offset=HEADER_SIZE, shape=(capacity,))
+
+    def get(self, key):
+        entry_key, score, move, depth, flag = self.table[key & self.mask].item()
+        if entry_key != key:
+            return None
+        return (depth, score, flag, move)
+
+    def put(self, key, value):
+        index = key & self.mask
+        entry_key, _, _, entry_depth, _ = self.table[index].item()
+        depth, score, flag, move = value
+        # Keep a deeper result for the same position
+        if entry_key == key and entry_depth > depth:
+            return
+        self.table[index] = (key, score, move, depth, flag)
+
+    def clear(self):
+        self.table[:] = 0
+
+    def save(self, path=None):
+        """Flush a mapped table to disk, or write the table to a new file"""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the transposition table to")
+        if isinstance(self.table, np.memmap) and path == self.path:
+            if self.read_only:
+                raise ValueError("A read-only transposition table cannot be saved over its file")
+            self.table.flush()
+            return
+        self._create(path, self.capacity)
+        target = np.memmap(path, dtype=TT_DTYPE, mode='r+', offset=HEADER_SIZE, shape=(self.capacity,))
+        target[:] = self.table
+        target.flush()
+
+    def __len__(self):
+        """Number of occupied slots"""
+        return int(np.count_nonzero(self.table['key']))
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+Texel tuning of the evaluation parameters against game results
+Positions are streamed from a PGN or EPD file into a sparse feature matrix,
+where the evaluation is the dot product of a position's features with the
+parameter vector (piece values, piece-square tables and term weights). The
+parameters are then fitted by full-batch gradient descent (Adam) on the squared
+error between the game result and a logistic of the evaluation.
+Requires numpy (pip install numpy).
+Usage:
+    python Chess_Tuner.py extract games.pgn features.npz [--max-positions 1000000]
+    python Chess_Tuner.py fit features.npz params.json [--epochs 500]
+The parameter file is loaded with ChessBot(params_file='params.json').
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from array import array
+
+import chess
+import chess.pgn
+import numpy as np
+
+from Chess_Bot import ChessBot, EVAL_TABLES
+
+# Parameter vector layout: material of pawn to queen, then the piece-square
+# tables, then the secondary term weights
+MATERIAL_PIECES = chess.PIECE_TYPES[:-1]
+TABLE_NAMES = list(EVAL_TABLES)
+WEIGHT_NAMES = ['mobility', 'king_safety', 'pawn_structure']
+TABLE_OFFSET = len(MATERIAL_PIECES)
+WEIGHT_OFFSET = TABLE_OFFSET + 64 * len(TABLE_NAMES)
+PARAM_COUNT = WEIGHT_OFFSET + len(WEIGHT_NAMES)
+PIECE_TABLE_NAMES = {piece_type: chess.piece_name(piece_type) for piece_type in MATERIAL_PIECES}
+
+# Term weights are fractions, so they move at a smaller step than centipawn values
+WEIGHT_STEP_SCALE = 0.01
+
+RESULTS = {'1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5}
+
+def params_to_vector(params):
+    """Flatten a ChessBot.eval_params() dict"""
+    vector = np.zeros(PARAM_COUNT)
+    for i, piece_type in enumerate(MATERIAL_PIECES):
+        vector[i] = params['piece_values'][chess.piece_name(piece_type)]
+    for i, name in enumerate(TABLE_NAMES):
+        vector[TABLE_OFFSET + 64 * i:TABLE_OFFSET + 64 * (i + 1)] = params['tables'][name]
+    for i, name in enumerate(WEIGHT_NAMES):
+        vector[WEIGHT_OFFSET + i] = params['weights'][name]
+    return vector
+
+def vector_to_params(vector):
+    """Inverse of params_to_vector; values and tables are rounded to whole centipawns"""
+    return {
+        'piece_values': {chess.piece_name(piece_type): int(round(vector[i]))
+                         for i, piece_type in enumerate(MATERIAL_PIECES)},
+        'tables': {name: [int(round(value)) for value in vector[TABLE_OFFSET + 64 * i:TABLE_OFFSET + 64 * (i + 1)]]
+                   for i, name in enumerate(TABLE_NAMES)},
+        'weights': {name: round(float(vector[WEIGHT_OFFSET + i]), 4) for i, name in enumerate(WEIGHT_NAMES)},
+    }
+
+def position_features(bot, board):
+    """
+    Sparse features of a position as {column: value}, from white's point of view
+    The dot product with the parameter vector equals the bot's evaluation for white.
+    """
+    features = {}
+    is_endgame = bot.is_endgame(board)
+    for square, piece in board.piece_map().items():
+        sign = 1 if piece.color == chess.WHITE else -1
+        if piece.piece_type == chess.KING:
+            table = TABLE_NAMES.index('king_endgame' if is_endgame else 'king_middlegame')
+        else:
+            column = piece.piece_type - 1
+            features[column] = features.get(column, 0) + sign
+            table = TABLE_NAMES.index(PIECE_TABLE_NAMES[piece.piece_type])
+        # Same table indexing as ChessBot.evaluate_position
+        column = TABLE_OFFSET + 64 * table + (63 - square if piece.color == chess.WHITE else square)
+        features[column] = features.get(column, 0) + sign
+    features[WEIGHT_OFFSET] = bot.evaluate_mobility(board)
+    features[WEIGHT_OFFSET + 1] = bot.evaluate_king_safety(board)
+    features[WEIGHT_OFFSET + 2] = bot.evaluate_pawn_structure(board)
+    return {column: value for column, value in features.items() if value}
+
+def pgn_positions(path, skip_plies):
+    """Yield (board, result) for the quiet positions of every finished game in a PGN file"""
+    with open(path) as f:
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            result = RESULTS.get(game.headers.get('Result'))
+            if result is None:
+                continue
+            board = game.board()
+            for ply, move in enumerate(game.mainline_moves()):
+                capture = board.is_capture(move)
+                board.push(move)
+                # Skip the opening book and positions with a capture or check pending
+                if ply + 1 >= skip_plies and not capture and not board.is_check():
+                    yield board, result
+
+def epd_positions(path):
+    """
+    Yield (board, result) from an EPD file
+    The result is read from a c9 or c0 opcode ("1-0", "0-1", "1/2-1/2") or a
+    trailing [1.0], [0.5] or [0.0].
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            result = None
+            if line.endswith(']') and '[' in line:
+                line, _, label = line[:-1].rpartition('[')
+                result = float(label)
+            board, operations = chess.Board.from_epd(line)
+            for opcode in ('c9', 'c0'):
+                if result is None and opcode in operations:
+                    result = RESULTS.get(str(operations[opcode]).strip('"'))
+            if result is not None:
+                yield board, result
+
+def extract(path, out_path, max_positions=None, skip_plies=8):
+    """Stream labelled positions from path into a compressed sparse feature file"""
+    bot = ChessBot()
+    positions = epd_positions(path) if path.lower().endswith('.epd') else pgn_positions(path, skip_plies)
+    # Compact CSR layout: row offsets, int16 columns and values, float32 results
+    row_offsets = array('q', [0])
+    columns = array('h')
+    values = array('h')
+    results = array('f')
+    start_time = time.time()
+    for board, result in positions:
+        for column, value in position_features(bot, board).items():
+            columns.append(column)
+            values.append(value)
+        row_offsets.append(len(columns))
+        results.append(result)
+        if len(results) % 100000 == 0:
+            print(f"{len(results)} positions ({time.time() - start_time:.0f} s)")
+        if max_positions and len(results) >= max_positions:
+            break
+    np.savez_compressed(out_path, row_offsets=np.frombuffer(row_offsets, dtype=np.int64),
+                        columns=np.frombuffer(columns, dtype=np.int16),
+                        values=np.frombuffer(values, dtype=np.int16),
+                        results=np.frombuffer(results, dtype=np.float32))
+    print(f"Wrote {len(results)} positions to {out_path} in {time.time() - start_time:.1f} s")
+
+class FeatureMatrix:
+    """Sparse feature matrix with vectorized products against a parameter vector"""
+    def __init__(self, path):
+        data = np.load(path)
+        row_offsets = data['row_offsets']
+        self.results = data['results'].astype(np.float64)
+        self.rows = np.repeat(np.arange(len(self.results), dtype=np.int32), np.diff(row_offsets))
+        self.columns = data['columns'].astype(np.intp)
+        self.values = data['values'].astype(np.float64)
+
+    def __len__(self):
+        return len(self.results)
+
+    def evaluate(self, vector):
+        """White-relative evaluation of every position"""
+        return np.bincount(self.rows, weights=self.values * vector[self.columns], minlength=len(self))
+
+    def gradient(self, row_weights):
+        """Transposed product: sum over positions of row_weights times the features"""
+        return np.bincount(self.columns, weights=self.values * row_weights[self.rows], minlength=PARAM_COUNT)
+
+def win_probability(evaluation, k):
+    return 1.0 / (1.0 + np.power(10.0, -k * evaluation / 400.0))
+
+def mean_error(matrix, evaluation, k):
+    return float(np.mean((matrix.results - win_probability(evaluation, k)) ** 2))
+
+def fit_scale(matrix, vector):
+    """Scaling constant K that best maps the starting evaluation to results"""
+    evaluation = matrix.evaluate(vector)
+    low, high = 0.01, 5.0
+    # Golden-section search; the error is unimodal in K
+    ratio = (math.sqrt(5) - 1) / 2
+    for _ in range(40):
+        a = high - ratio * (high - low)
+        b = low + ratio * (high - low)
+        if mean_error(matrix, evaluation, a) < mean_error(matrix, evaluation, b):
+            high = b
+        else:
+            low = a
+    return (low + high) / 2
+
+def fit(matrix, vector, k, epochs=500, learning_rate=1.0):
+    """Fit the parameters by Adam on the mean squared result error"""
+    vector = vector.copy()
+    step_scale = np.ones(PARAM_COUNT)
+    step_scale[WEIGHT_OFFSET:] = WEIGHT_STEP_SCALE
+    first_moment = np.zeros(PARAM_COUNT)
+    second_moment = np.zeros(PARAM_COUNT)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    slope = k * math.log(10) / 400.0
+    for epoch in range(1, epochs + 1):
+        probability = win_probability(matrix.evaluate(vector), k)
+        # d/dvector of mean (result - p)^2, through the logistic
+        row_weights = -2.0 * (matrix.results - probability) * probability * (1 - probability) * slope
+        gradient = matrix.gradient(row_weights) / len(matrix)
+        first_moment = beta1 * first_moment + (1 - beta1) * gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+        corrected_first = first_moment / (1 - beta1 ** epoch)
+        corrected_second = second_moment / (1 - beta2 ** epoch)
+        vector -= learning_rate * step_scale * corrected_first / (np.sqrt(corrected_second) + epsilon)
+        if epoch % 50 == 0 or epoch == epochs:
+            print(f"epoch {epoch}: error {mean_error(matrix, matrix.evaluate(vector), k):.6f}")
+    return vector
+
+def run_extract(args):
+    extract(args.games, args.features, args.max_positions, args.skip_plies)
+    return 0
+
+def run_fit(args):
+    matrix = FeatureMatrix(args.features)
+    start = params_to_vector(ChessBot(params_file=args.start).eval_params())
+    k = args.k or fit_scale(matrix, start)
+    print(f"{len(matrix)} positions, K = {k:.3f}, starting error {mean_error(matrix, matrix.evaluate(start), k):.6f}")
+    start_time = time.time()
+    vector = fit(matrix, start, k, args.epochs, args.learning_rate)
+    print(f"Fitted in {time.time() - start_time:.1f} s")
+    with open(args.params, 'w') as f:
+        json.dump(vector_to_params(vector), f, indent=1)
+    print(f"Parameters written to {args.params}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the evaluation parameters on game results")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    extract_command = commands.add_parser('extract', help="stream a PGN or EPD file into a feature file")
+    extract_command.add_argument('games', help="PGN file, or EPD file (.epd) with c9/c0 or [result] labels")
+    extract_command.add_argument('features', help="output .npz feature file")
+    extract_command.add_argument('--max-positions', type=int)
+    extract_command.add_argument('--skip-plies', type=int, default=8, help="opening plies skipped in PGN games")
+    extract_command.set_defaults(run=run_extract)
+
+    fit_command = commands.add_parser('fit', help="fit the parameters and write a parameter file")
+    fit_command.add_argument('features', help=".npz feature file from extract")
+    fit_command.add_argument('params', help="output JSON parameter file")
+    fit_command.add_argument('--start', help="parameter file to start from (default: the built-in values)")
+    fit_command.add_argument('--epochs', type=int, default=500)
+    fit_command.add_argument('--learning-rate', type=float, default=1.0)
+    fit_command.add_argument('-k', type=float, help="logistic scale; fitted to the data when omitted")
+    fit_command.set_defaults(run=run_fit)
+
+    args = parser.parse_args()
+    sys.exit(args.run(args))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -2,22 +2,51 @@ import pygame as pg
 import chess
 import sys
 import os
+import time
 from Chess_Bot import ChessBot
+from Chess_Clock import GameClock, parse_time_control
 
 # Constants
 WIDTH = HEIGHT = 512
 DIMENSION = 8
 SQ_SIZE = HEIGHT // DIMENSION
 MAX_FPS = 15
+TIME_CONTROL = '5+3'  # minutes per player + seconds increment per move
 IMAGES = {}
+PIECES = ['wp', 'wR', 'wN', 'wB', 'wK', 'wQ', 'bp', 'bR', 'bN', 'bB', 'bK', 'bQ']
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Images")
 
-def load_images():
-    """Load the chess piece images"""
-    pieces = ['wp', 'wR', 'wN', 'wB', 'wK', 'wQ', 'bp', 'bR', 'bN', 'bB', 'bK', 'bQ']
-    for piece in pieces:
-        # Use the path to the images folder
-        image_path = os.path.join("images", piece + ".png")
-        IMAGES[piece] = pg.transform.scale(pg.image.load(image_path), (SQ_SIZE, SQ_SIZE))
+def atlas_path(square_size):
+    """Cached atlas of all pieces scaled to square_size, in PIECES order left to right"""
+    return os.path.join(IMAGE_DIR, f"atlas_{square_size}.png")
+
+def build_atlas(square_size):
+    """Smooth-scale every piece image into one atlas surface and try to cache it on disk"""
+    atlas = pg.Surface((square_size * len(PIECES), square_size), pg.SRCALPHA)
+    for i, piece in enumerate(PIECES):
+        image = pg.image.load(os.path.join(IMAGE_DIR, piece + ".png"))
+        atlas.blit(pg.transform.smoothscale(image, (square_size, square_size)), (i * square_size, 0))
+    try:
+        pg.image.save(atlas, atlas_path(square_size))
+    except (pg.error, OSError):
+        pass  # read-only install; the atlas is rebuilt next launch
+    return atlas
+
+def load_images(square_size=SQ_SIZE):
+    """
+    Load the chess piece images from the atlas for this square size
+    The atlas is rebuilt when missing or older than any piece image.
+    """
+    path = atlas_path(square_size)
+    sources = [os.path.join(IMAGE_DIR, piece + ".png") for piece in PIECES]
+    if os.path.exists(path) and os.path.getmtime(path) >= max(map(os.path.getmtime, sources)):
+        atlas = pg.image.load(path)
+    else:
+        atlas = build_atlas(square_size)
+    if pg.display.get_surface():
+        atlas = atlas.convert_alpha()
+    for i, piece in enumerate(PIECES):
+        IMAGES[piece] = atlas.subsurface(pg.Rect(i * square_size, 0, square_size, square_size))
 
 def draw_board(screen):
     """Draw the chess board"""
@@ -86,8 +115,14 @@ def convert_board_to_pygame_format(chess_board):
         board_2d.append(row)
     return board_2d
 
-def main():
-    """Main function to run the game"""
+def main(start_time=None):
+    """
+    Main function to run the game
+    :param start_time: time.perf_counter() at launch, for the time-to-first-frame report
+    """
+    if start_time is None:
+        start_time = time.perf_counter()
+    first_frame = True
     pg.init()
     screen = pg.display.set_mode((WIDTH, HEIGHT + 100))  # Extra space for status
     clock = pg.time.Clock()
@@ -101,6 +136,10 @@ def main():
     difficulty = 'medium'  # Default difficulty
     bot = ChessBot(difficulty=difficulty)
     
+    # Game clock, started with White to move
+    game_clock = GameClock(*parse_time_control(TIME_CONTROL))
+    game_clock.start(chess.WHITE)
+    
     # Game state variables
     selected_square = None
     player_moves = []
@@ -150,6 +189,8 @@ def main():
                     selected_square = None
                     player_moves = []
                     game_over = False
+                    game_clock.reset()
+                    game_clock.start(chess.WHITE)
                     status_message = "New game started. Your turn (White)"
                 
                 # Only process board clicks if the game is not over and it's the player's turn
@@ -183,6 +224,7 @@ def main():
                             if move in chess_board.legal_moves:
                                 # Make the move
                                 chess_board.push(move)
+                                game_clock.press()
                                 pygame_board = convert_board_to_pygame_format(chess_board)
                                 selected_square = None
                                 player_moves = []
@@ -191,9 +233,11 @@ def main():
                                 if chess_board.is_checkmate():
                                     status_message = "Checkmate! You win!"
                                     game_over = True
+                                    game_clock.stop()
                                 elif chess_board.is_stalemate() or chess_board.is_insufficient_material():
                                     status_message = "Draw!"
                                     game_over = True
+                                    game_clock.stop()
                                 else:
                                     # Bot's turn
                                     status_message = f"Bot is thinking... ({difficulty} difficulty)"
@@ -233,21 +277,29 @@ def main():
                                     
                                     pg.display.flip()
                                     
-                                    # Get bot's move
-                                    bot_move = bot.get_best_move(chess_board)
+                                    # Get bot's move, timed from its clock
+                                    bot_move = bot.get_best_move(chess_board, game_clock.remaining(chess_board.turn),
+                                                                 game_clock.increment)
                                     
                                     # Make bot's move
                                     chess_board.push(bot_move)
                                     pygame_board = convert_board_to_pygame_format(chess_board)
                                     
                                     # Check if the game is over after bot's move
-                                    if chess_board.is_checkmate():
+                                    if game_clock.flagged(not player_color):
+                                        status_message = "Bot ran out of time! You win!"
+                                        game_over = True
+                                        game_clock.stop()
+                                    elif chess_board.is_checkmate():
                                         status_message = "Checkmate! Bot wins!"
                                         game_over = True
+                                        game_clock.stop()
                                     elif chess_board.is_stalemate() or chess_board.is_insufficient_material():
                                         status_message = "Draw!"
                                         game_over = True
+                                        game_clock.stop()
                                     else:
+                                        game_clock.press()
                                         status_message = "Your turn"
                             else:
                                 # Illegal move, select the new square if it contains a piece of the player's color
@@ -264,6 +316,12 @@ def main():
                             if piece is not None and piece.color == player_color:
                                 selected_square = (row, col)
         
+        # Player out of time
+        if not game_over and game_clock.flagged(player_color):
+            status_message = "Out of time! Bot wins!"
+            game_over = True
+            game_clock.stop()
+        
         # Draw everything
         draw_board(screen)
         
@@ -301,12 +359,18 @@ def main():
         screen.blit(hard_text, (hard_button.x + 10, hard_button.y + 5))
         screen.blit(new_game_text, (new_game_button.x + 10, new_game_button.y + 5))
         
-        # Draw status message
+        # Draw status message and clocks over a cleared strip
+        pg.draw.rect(screen, pg.Color("white"), pg.Rect(0, HEIGHT + 45, WIDTH, 55))
         status_text = font.render(status_message, True, pg.Color("black"))
         screen.blit(status_text, (10, HEIGHT + 50))
+        clock_text = font.render(game_clock.display(), True, pg.Color("black"))
+        screen.blit(clock_text, (10, HEIGHT + 75))
         
         # Update display
         pg.display.flip()
+        if first_frame:
+            print(f"First frame after {(time.perf_counter() - start_time) * 1000:.0f} ms")
+            first_frame = False
         clock.tick(MAX_FPS)
     
     pg.quit()